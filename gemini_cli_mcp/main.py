@@ -1,19 +1,65 @@
 import streamlit as st
 import asyncio
+import os
+import queue
+import threading
+from typing import AsyncIterator, Iterator
 from dotenv import load_dotenv
-from src.fastmcp.mcp_client3 import get_gemini_client
+from src.fastmcp.mcp_client3 import GeminiMCPClient, get_gemini_client
 
+_STREAM_END = object()
 
-# OpenAI 클라이언트 준비
-async def ask_llm(user_query: str) -> str:
-    client = st.session_state.client
+
+# 프로세스 전체에서 하나만 사용하는 백그라운드 이벤트 루프
+# Streamlit 1.50.0에서는 직접 await 사용 불가
+# asyncio.run()도 이미 이벤트 루프가 실행 중이면 사용 불가
+# 해결책: 별도 스레드에서 이벤트 루프를 계속 실행하고 run_coroutine_threadsafe로 작업 제출
+# 브라우저 탭(세션)이 여러 개여도 루프, 클라이언트, MCP 서버 프로세스는 하나만 사용
+@st.cache_resource
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="mcp-loop", daemon=True).start()
+    return loop
+
+
+# 실패 시 None을 반환하면 그 값이 프로세스 수명 동안 캐시되므로 예외를 던진다
+# (cache_resource는 예외를 캐시하지 않아 환경 변수를 고친 뒤 다시 시도할 수 있다)
+@st.cache_resource
+def get_shared_client() -> GeminiMCPClient:
+    load_dotenv()
+    # 서버 프로세스를 띄우고 초기화할 때까지 기다리는 최대 시간(초)
+    timeout = float(os.getenv("MCP_CONNECT_TIMEOUT", "60"))
+    future = asyncio.run_coroutine_threadsafe(get_gemini_client(), get_event_loop())
+    try:
+        client = future.result(timeout=timeout)
+    except TimeoutError:
+        # 취소하면 get_gemini_client가 이미 띄운 서버 프로세스도 정리한다
+        future.cancel()
+        raise TimeoutError(f"{timeout:g}초 안에 연결되지 않았습니다.")
     if client is None:
-        st.error("서버에 연결하지 못했습니다.")
-    return await client.chat(user_query)
+        raise RuntimeError("GOOGLE_API_KEY 또는 PROJECT_ID 환경 변수가 설정되지 않았습니다.")
+    return client
+
 
+def iterate_in_loop(agen: AsyncIterator[str]) -> Iterator[str]:
+    """백그라운드 루프에서 비동기 제너레이터를 실행하고 조각을 동기적으로 전달"""
+    chunks: queue.Queue = queue.Queue()
 
-def run_async_task(coro):
-    return st.session_state.loop.run_until_complete(coro)
+    async def pump():
+        try:
+            async for chunk in agen:
+                chunks.put(chunk)
+        finally:
+            chunks.put(_STREAM_END)
+
+    future = asyncio.run_coroutine_threadsafe(pump(), get_event_loop())
+    try:
+        while (chunk := chunks.get()) is not _STREAM_END:
+            yield chunk
+        future.result()
+    finally:
+        # 사용자가 페이지를 떠나 스크립트가 중단되면 진행 중인 요청도 취소
+        future.cancel()
 
 
 def run_streamlit():
@@ -24,35 +70,33 @@ def run_streamlit():
     st.title("FastMCP + Gemini LLM 연동 예제")
     st.write("LLM에게 질문을 보내고 답변을 받아보세요.")
 
-    if "loop" not in st.session_state:
-        st.session_state.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(st.session_state.loop)
-
-        st.session_state.client = run_async_task(get_gemini_client())
-        if st.session_state.client is None:
-            st.error("서버에 연결하지 못했습니다. 환경 변수를 확인하세요.")
+    client: GeminiMCPClient | None = None
+    try:
+        client = get_shared_client()
+    except (RuntimeError, ConnectionError, TimeoutError) as e:
+        st.error(f"서버에 연결하지 못했습니다. {e}")
 
     if st.button("종료"):
-        import os
-
         # 종료 버튼 클릭 시 cleanup 호출
+        if client is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(
+                    client.cleanup(), get_event_loop()
+                ).result(timeout=10)
+            except Exception as e:
+                print(f"클라이언트 정리 실패: {e}")
         os._exit(0)
     # 사용자 입력
     query = st.text_area("질의하세요:", height=120)
 
-    # 버튼 클릭 시 LLM 호출
-    # Streamlit 1.50.0에서는 직접 await 사용 불가
-    # asyncio.run()도 이미 이벤트 루프가 실행 중이면 사용 불가
-    # 해결책: 새 이벤트 루프를 만들고, 스레드에서 run_until_complete로 async 함수 실행
-    # 클라이언트(get_client())는 앱 시작 시 한 번만 초기화하고 재사용
+    # 버튼 클릭 시 LLM 호출, 응답은 생성되는 대로 화면에 표시
     if st.button("질문하기"):
-        if query.strip():
+        if client is None:
+            st.error("서버에 연결하지 못했습니다.")
+        elif query.strip():
+            st.subheader("LLM 응답:")
             with st.spinner("LLM 응답 생성 중..."):
-
-                result = run_async_task(ask_llm(query))
-
-                st.subheader("LLM 응답:")
-                st.write(result)
+                st.write_stream(iterate_in_loop(client.chat_stream(query)))
         else:
             st.warning("질문을 입력해주세요.")
 
@@ -2,19 +2,20 @@
 Gemini MCP 클라이언트 - MCP 서버와 통신하는 클라이언트
 """
 
+import anyio
 import asyncio
 import json
 import subprocess
-import sys
 import os
 import mcp
 import queue
-from typing import Dict, Any, List, Optional, cast, Union
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional, cast, Union
 from contextlib import AsyncExitStack  # for managing mulple async tasks
 from mcp import ClientSession, StdioServerParameters, types as mcptypes
 from mcp.client.stdio import stdio_client
 from google import genai
-from google.genai import types as genai_types
 from google.genai.types import Tool, FunctionDeclaration, GenerateContentConfig
 from dataclasses import dataclass
 
@@ -33,17 +34,595 @@ class MCPServer:
     error_queue: queue.Queue
 
 
+TOOL_CALL_MARKER = "TOOL_CALL:"
+
+
+@dataclass
+class ToolCall:
+    """모델이 요청한 도구 호출"""
+
+    tool: str
+    arguments: Dict[str, Any]
+
+
+def _parse_tool_calls(response_text: str) -> List[ToolCall]:
+    """
+    응답에서 TOOL_CALL 블록을 모두 추출
+
+    Args:
+        response_text: Gemini 응답 텍스트
+
+    Returns:
+        파싱에 성공한 도구 호출 목록 (없으면 빈 목록)
+    """
+    decoder = json.JSONDecoder()
+    tool_calls: List[ToolCall] = []
+    start = response_text.find(TOOL_CALL_MARKER)
+    while start != -1:
+        body = response_text[start + len(TOOL_CALL_MARKER) :].lstrip()
+        try:
+            tool_call, _ = decoder.raw_decode(body.replace(r"\n", ""))
+            tool_calls.append(
+                ToolCall(
+                    tool=tool_call["tool"], arguments=tool_call.get("arguments", {})
+                )
+            )
+        except (json.JSONDecodeError, KeyError, TypeError):
+            pass
+        start = response_text.find(TOOL_CALL_MARKER, start + len(TOOL_CALL_MARKER))
+    return tool_calls
+
+
+def _tool_result_text(tool_result: Optional[mcptypes.CallToolResult]) -> str:
+    """도구 실행 결과에서 텍스트 추출"""
+    if tool_result is None or not tool_result.content:
+        return "도구 호출에 실패했습니다."
+    return cast(mcptypes.TextContent, tool_result.content[0]).text
+
+
+# 결과 축약 시 제거할 저가치 필드 (메타데이터, 좌표 등)
+LOW_VALUE_FIELDS = frozenset(
+    {"@context", "@id", "@type", "geometry", "geocode", "references", "parameters"}
+)
+
+SHAPING_STRATEGIES = ("head_tail", "truncate", "sample")
+# 잘라낸 자리에 넣는 표시
+CLIP_MARKER = "\n...(생략)..."
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 토큰 수를 빠르게 추정
+
+    ASCII 문자는 약 4자당 1토큰, 한글 등 비 ASCII 문자는 1자당 1토큰으로 계산한다.
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+@dataclass
+class ShapedResult:
+    """토큰 예산에 맞게 축약된 도구 결과"""
+
+    text: str
+    original_tokens: int
+    tokens: int
+    dropped_fields: int = 0
+    omitted_items: int = 0
+
+    @property
+    def trimmed(self) -> bool:
+        return self.tokens < self.original_tokens
+
+    def report(self) -> str:
+        """축약 내역 요약 문자열"""
+        details = [f"약 {self.original_tokens} → {self.tokens} 토큰"]
+        if self.dropped_fields:
+            details.append(f"필드 {self.dropped_fields}개 제거")
+        if self.omitted_items:
+            details.append(f"항목 {self.omitted_items}개 생략")
+        return f"[결과 축약: {', '.join(details)}]"
+
+
+def _pick(items: list, keep: int, strategy: str) -> list:
+    """전략에 따라 목록에서 keep개 항목 선택"""
+    if strategy == "truncate":
+        return items[:keep]
+    if strategy == "sample":
+        step = len(items) / keep
+        return [items[int(i * step)] for i in range(keep)]
+    head = (keep + 1) // 2
+    return items[:head] + items[len(items) - (keep - head) :]
+
+
+def _drop_low_value(value: Any) -> tuple[Any, int]:
+    """빈 값과 저가치 필드를 재귀적으로 제거하고 제거한 필드 수를 반환"""
+    if isinstance(value, dict):
+        pruned: Dict[str, Any] = {}
+        dropped = 0
+        for key, item in value.items():
+            if key in LOW_VALUE_FIELDS or item in (None, "", [], {}):
+                dropped += 1
+                continue
+            pruned[key], count = _drop_low_value(item)
+            dropped += count
+        return pruned, dropped
+    if isinstance(value, list):
+        pruned_items = []
+        dropped = 0
+        for item in value:
+            pruned_item, count = _drop_low_value(item)
+            pruned_items.append(pruned_item)
+            dropped += count
+        return pruned_items, dropped
+    return value, 0
+
+
+def _limit_lists(value: Any, keep: int, strategy: str) -> tuple[Any, int]:
+    """keep개를 넘는 모든 목록을 줄이고 생략한 항목 수를 반환"""
+    if isinstance(value, dict):
+        limited: Dict[str, Any] = {}
+        omitted = 0
+        for key, item in value.items():
+            limited[key], count = _limit_lists(item, keep, strategy)
+            omitted += count
+        return limited, omitted
+    if isinstance(value, list):
+        omitted = 0
+        if len(value) > keep:
+            omitted = len(value) - keep
+            value = _pick(value, keep, strategy)
+        items = []
+        for item in value:
+            limited_item, count = _limit_lists(item, keep, strategy)
+            items.append(limited_item)
+            omitted += count
+        return items, omitted
+    return value, 0
+
+
+def _longest_list(value: Any) -> int:
+    if isinstance(value, dict):
+        return max((_longest_list(item) for item in value.values()), default=0)
+    if isinstance(value, list):
+        return max([len(value)] + [_longest_list(item) for item in value])
+    return 0
+
+
+def _clip_text(text: str, budget: int, strategy: str) -> str:
+    """텍스트를 예산 토큰 수에 맞게 자르기 (생략 표시까지 포함해 예산 안에 들어가게)"""
+    tokens = estimate_tokens(text)
+    if tokens <= budget:
+        return text
+    max_chars = len(text) * budget // tokens
+    if strategy == "sample":
+        lines = text.splitlines()
+        if len(lines) > 1:
+            keep = max(1, len(lines) * budget // tokens)
+            sampled = "\n".join(_pick(lines, min(keep, len(lines)), strategy))
+            room = max(1, max_chars - len(CLIP_MARKER))
+            return sampled[:room] + CLIP_MARKER
+    if strategy == "truncate":
+        return text[: max(1, max_chars - len(CLIP_MARKER))] + CLIP_MARKER
+    room = max(2, max_chars - len(CLIP_MARKER) - 1)
+    head = room // 2
+    return text[:head] + CLIP_MARKER + "\n" + text[len(text) - (room - head) :]
+
+
+def shape_tool_result(
+    tool_result: Optional[mcptypes.CallToolResult],
+    budget: int,
+    strategy: str = "head_tail",
+) -> ShapedResult:
+    """
+    도구 결과를 프롬프트에 넣기 전에 토큰 예산에 맞게 축약
+
+    구조화된 결과(structuredContent 또는 JSON 텍스트)는 저가치 필드를 먼저 제거하고,
+    그래도 예산을 넘으면 목록 길이를 줄인다. 최종적으로 텍스트 자체를 자른다.
+
+    Args:
+        tool_result: 도구 실행 결과
+        budget: 허용하는 최대 추정 토큰 수
+        strategy: 목록/텍스트 축약 방식 (head_tail, truncate, sample)
+
+    Returns:
+        축약된 결과와 축약 내역
+    """
+    text = _tool_result_text(tool_result)
+    original_tokens = estimate_tokens(text)
+
+    data: Any = None
+    if tool_result is not None and tool_result.structuredContent is not None:
+        data = tool_result.structuredContent
+    elif original_tokens > budget:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            data = None
+
+    if original_tokens <= budget:
+        return ShapedResult(text, original_tokens, original_tokens)
+
+    dropped = omitted = 0
+    if isinstance(data, (dict, list)):
+        data, dropped = _drop_low_value(data)
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        keep = _longest_list(data)
+        while estimate_tokens(text) > budget and keep > 1:
+            keep //= 2
+            limited, omitted = _limit_lists(data, keep, strategy)
+            text = json.dumps(limited, ensure_ascii=False, separators=(",", ":"))
+
+    text = _clip_text(text, budget, strategy)
+    return ShapedResult(text, original_tokens, estimate_tokens(text), dropped, omitted)
+
+
+class ToolResultCache:
+    """
+    읽기 전용(readOnlyHint) 또는 멱등(idempotentHint) 도구의 결과를 보관하는 LRU 캐시
+
+    키는 (서버명, 도구명, 정규화된 인수 JSON)이며, 도구별 TTL을 지정할 수 있다.
+    TTL이 0 이하인 도구는 캐시하지 않는다.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        default_ttl: float = 60.0,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Args:
+            max_entries: 최대 보관 항목 수 (초과 시 가장 오래 사용되지 않은 항목 제거)
+            default_ttl: 도구별 TTL이 없을 때 사용할 기본 TTL(초)
+            ttls: 도구명 → TTL(초)
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self._entries: OrderedDict[tuple, tuple[float, mcptypes.CallToolResult]] = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def ttl_for(self, tool_name: str) -> float:
+        return self.ttls.get(tool_name, self.default_ttl)
+
+    @staticmethod
+    def make_key(server: str, tool_name: str, arguments: Dict[str, Any]) -> tuple:
+        """인수 순서와 공백에 영향받지 않는 캐시 키 생성"""
+        canonical = json.dumps(
+            arguments, sort_keys=True, separators=(",", ":"), default=str
+        )
+        return (server, tool_name, canonical)
+
+    def get(self, key: tuple) -> Optional[mcptypes.CallToolResult]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: tuple, result: mcptypes.CallToolResult) -> None:
+        ttl = self.ttl_for(key[1])
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 적중/실패 통계 반환"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def _server_params(server_script_path: str) -> StdioServerParameters:
+    """서버 스크립트 경로로 stdio 서버 실행 정보 생성"""
+    command = "python" if server_script_path.endswith(".py") else "node"
+    return StdioServerParameters(command=command, args=[server_script_path])
+
+
+def _unwrap_group(error: BaseException) -> BaseException:
+    """중첩된 예외 그룹의 첫 번째 하위 예외 반환 (그룹이 아니면 그대로)"""
+    while isinstance(error, BaseExceptionGroup) and error.exceptions:
+        error = error.exceptions[0]
+    return error
+
+
+@dataclass
+class PooledSession:
+    """풀에 속한 MCP 서버 세션"""
+
+    index: int
+    session: ClientSession
+    stop: asyncio.Event
+    task: asyncio.Task
+    in_flight: int = 0
+    completed: int = 0
+
+
+class MCPSessionPool:
+    """
+    동일한 MCP 서버 프로세스 K개를 띄우고 도구 호출을 가장 한가한 세션으로 분배하는 풀
+
+    상태를 가지는 도구(pinned_tools) 또는 pin_key를 지정한 호출은 처음 배정된 세션에 고정된다.
+    모든 세션의 대기 중인 호출 수가 scale_up_threshold 이상이면 max_size까지 세션을 늘린다.
+    """
+
+    def __init__(
+        self,
+        server_params: StdioServerParameters,
+        size: int = 2,
+        max_size: int = 8,
+        scale_up_threshold: int = 4,
+        pinned_tools: Optional[set[str]] = None,
+    ):
+        """
+        Args:
+            server_params: 서버 실행 정보
+            size: 시작 시 띄울 세션 수
+            max_size: 최대 세션 수
+            scale_up_threshold: 세션을 추가하는 기준 (가장 한가한 세션의 진행 중 호출 수)
+            pinned_tools: 항상 같은 세션에서 실행해야 하는 도구 이름
+        """
+        self.server_params = server_params
+        self.size = size
+        self.max_size = max(size, max_size)
+        self.scale_up_threshold = scale_up_threshold
+        self.pinned_tools = pinned_tools or set()
+        self.sessions: List[PooledSession] = []
+        self._pins: Dict[str, PooledSession] = {}
+        self._scaling: Optional[asyncio.Task] = None
+        self._respawns: set[asyncio.Task] = set()
+        self._next_index = 0
+        self._closed = False
+        self.scale_ups = 0
+        self.respawns = 0
+
+    async def _run_session(
+        self, ready: asyncio.Future, stop: asyncio.Event
+    ) -> None:
+        """세션 하나의 수명을 담당하는 작업 (컨텍스트 진입과 종료를 같은 작업에서 수행)"""
+        try:
+            async with stdio_client(self.server_params) as (read, write):
+                # 서버 프로세스가 죽어도 ClientSession은 스스로 끝나지 않으므로 양방향 스트림을
+                # 중계한다. 세션의 수신 루프는 읽기 스트림이 끝나면 대기 중인 호출에 연결 종료
+                # 오류를 돌려준 뒤 쓰기 스트림을 닫으므로, 그때 세션 작업을 끝낸다
+                to_session, incoming = anyio.create_memory_object_stream[Any](0)
+                outgoing, from_session = anyio.create_memory_object_stream[Any](0)
+                async with anyio.create_task_group() as tg:
+                    tg.start_soon(self._relay, read, to_session)
+                    tg.start_soon(self._relay, from_session, write, tg.cancel_scope.cancel)
+                    async with ClientSession(incoming, outgoing) as session:
+                        result = await session.initialize()
+                        ready.set_result((session, result))
+                        await stop.wait()
+                    tg.cancel_scope.cancel()
+            if not stop.is_set():
+                raise ConnectionError("서버 연결이 끊겼습니다")
+        except Exception as e:
+            # stdio_client와 작업 그룹이 겹겹이 감싼 ExceptionGroup에서 실제 원인을 꺼낸다
+            e = _unwrap_group(e)
+            if isinstance(e, (anyio.BrokenResourceError, anyio.ClosedResourceError)):
+                # 초기화 요청을 보내기 전에 서버가 죽으면 쓰기 스트림 오류로 나타난다
+                e = ConnectionError("서버 연결이 끊겼습니다")
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                print(f"❌ 풀 세션 종료: {e}")
+
+    @staticmethod
+    async def _relay(
+        source: Any, sink: Any, on_end: Optional[Callable[[], Any]] = None
+    ) -> None:
+        """스트림 메시지를 그대로 전달하고, 원본이 끝나면 on_end 호출"""
+        try:
+            async with sink:
+                async for message in source:
+                    await sink.send(message)
+        except (anyio.BrokenResourceError, anyio.ClosedResourceError):
+            pass
+        if on_end is not None:
+            on_end()
+
+    async def _spawn(self) -> mcptypes.InitializeResult:
+        """서버 프로세스를 하나 더 띄워 풀에 추가"""
+        ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+        task = asyncio.create_task(self._run_session(ready, stop))
+        try:
+            session, result = await ready
+        except BaseException:
+            # 초기화 실패 또는 취소 시 띄운 서버 프로세스를 정리
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise
+        pooled = PooledSession(
+            index=self._next_index, session=session, stop=stop, task=task
+        )
+        self._next_index += 1
+        self.sessions.append(pooled)
+        task.add_done_callback(lambda _: self._on_session_exit(pooled))
+        return result
+
+    def _on_session_exit(self, pooled: PooledSession) -> None:
+        """세션이 끝나면 풀에서 빼고, 예기치 않게 죽은 경우 새 세션으로 대체"""
+        if pooled in self.sessions:
+            self.sessions.remove(pooled)
+        for key in [key for key, pinned in self._pins.items() if pinned is pooled]:
+            del self._pins[key]
+        # 확장으로 늘어난 세션은 대체하지 않고 시작 크기만 유지
+        if self._closed or pooled.stop.is_set() or len(self.sessions) >= self.size:
+            return
+        print(f"🔁 풀 세션 {pooled.index} 대체")
+        self.respawns += 1
+        respawn = asyncio.create_task(self._spawn())
+        self._respawns.add(respawn)
+        respawn.add_done_callback(self._respawn_done)
+
+    def _respawn_done(self, respawn: asyncio.Task) -> None:
+        self._respawns.discard(respawn)
+        if not respawn.cancelled() and respawn.exception() is not None:
+            print(f"❌ 풀 세션 대체 실패: {respawn.exception()}")
+
+    async def start(self) -> mcptypes.InitializeResult:
+        """초기 세션들을 동시에 띄우고 첫 번째 초기화 결과 반환 (하나라도 실패하면 모두 종료)"""
+        spawns = [asyncio.create_task(self._spawn()) for _ in range(self.size)]
+        try:
+            results = await asyncio.gather(*spawns)
+        except BaseException:
+            for spawn in spawns:
+                spawn.cancel()
+            await asyncio.gather(*spawns, return_exceptions=True)
+            await self.close()
+            raise
+        return results[0]
+
+    def _least_loaded(self) -> PooledSession:
+        if not self.sessions:
+            raise RuntimeError("사용할 수 있는 MCP 세션이 없습니다")
+        return min(self.sessions, key=lambda pooled: pooled.in_flight)
+
+    def _maybe_scale_up(self, pooled: PooledSession) -> None:
+        """가장 한가한 세션도 밀려 있으면 백그라운드로 세션 추가"""
+        if (
+            pooled.in_flight < self.scale_up_threshold
+            or len(self.sessions) >= self.max_size
+            or (self._scaling is not None and not self._scaling.done())
+        ):
+            return
+        print(f"📈 세션 풀 확장: {len(self.sessions)} → {len(self.sessions) + 1}")
+        self.scale_ups += 1
+        self._scaling = asyncio.create_task(self._spawn())
+
+    def _select(self, tool_name: str, pin_key: Optional[str]) -> PooledSession:
+        if pin_key is None and tool_name in self.pinned_tools:
+            pin_key = tool_name
+        if pin_key is None:
+            pooled = self._least_loaded()
+            self._maybe_scale_up(pooled)
+            return pooled
+        pooled = self._pins.get(pin_key)
+        if pooled is None:
+            pooled = self._pins[pin_key] = self._least_loaded()
+        return pooled
+
+    async def call_tool(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        pin_key: Optional[str] = None,
+    ) -> mcptypes.CallToolResult:
+        """
+        도구 호출을 세션에 배정해 실행
+
+        Args:
+            tool_name: 도구 이름
+            arguments: 도구 인수
+            pin_key: 같은 세션에서 실행해야 하는 호출을 묶는 키 (예: 사용자 ID)
+        """
+        pooled = self._select(tool_name, pin_key)
+        pooled.in_flight += 1
+        try:
+            return await pooled.session.call_tool(name=tool_name, arguments=arguments)
+        finally:
+            pooled.in_flight -= 1
+            pooled.completed += 1
+
+    async def list_tools(self) -> mcptypes.ListToolsResult:
+        return await self._least_loaded().session.list_tools()
+
+    def stats(self) -> Dict[str, Any]:
+        """세션별 부하 통계 반환"""
+        return {
+            "sessions": [
+                {
+                    "index": pooled.index,
+                    "in_flight": pooled.in_flight,
+                    "completed": pooled.completed,
+                }
+                for pooled in self.sessions
+            ],
+            "pins": {key: pooled.index for key, pooled in self._pins.items()},
+            "scale_ups": self.scale_ups,
+            "respawns": self.respawns,
+        }
+
+    async def close(self) -> None:
+        """모든 세션과 서버 프로세스 종료"""
+        self._closed = True
+        pending = list(self._respawns)
+        if self._scaling is not None:
+            pending.append(self._scaling)
+        await asyncio.gather(*pending, return_exceptions=True)
+        sessions = list(self.sessions)
+        for pooled in sessions:
+            pooled.stop.set()
+        await asyncio.gather(*[pooled.task for pooled in sessions], return_exceptions=True)
+        self.sessions.clear()
+        self._pins.clear()
+
+
 class GeminiMCPClient:
-    def __init__(self, api_key: str, project_id: str):
+    def __init__(
+        self,
+        api_key: str,
+        project_id: str,
+        max_steps: int = 5,
+        max_tools_per_step: int = 4,
+        step_timeout: float = 60.0,
+        tool_cache: Optional[ToolResultCache] = None,
+        result_token_budget: int = 2000,
+        result_shaping: str = "head_tail",
+    ):
         """
         Gemini MCP 클라이언트 초기화
 
         Args:
             api_key: Gemini API 키
             model_name: 사용할 Gemini 모델명
+            max_steps: 한 번의 채팅에서 허용하는 최대 도구 호출 단계 수
+            max_tools_per_step: 한 단계에서 동시에 실행할 최대 도구 수
+            step_timeout: 한 단계의 도구 실행에 허용하는 최대 시간(초)
+            tool_cache: 읽기 전용/멱등 도구 결과 캐시 (None이면 캐시하지 않음)
+            result_token_budget: 프롬프트에 넣을 도구 결과 하나의 최대 추정 토큰 수
+            result_shaping: 예산 초과 결과의 축약 방식 (head_tail, truncate, sample)
         """
+        if result_shaping not in SHAPING_STRATEGIES:
+            raise ValueError(f"지원하지 않는 축약 방식: {result_shaping}")
         self.session: Optional[ClientSession] = None
+        self.pool: Optional[MCPSessionPool] = None
         self.exit_stack = AsyncExitStack()
+        self.max_steps = max_steps
+        self.max_tools_per_step = max_tools_per_step
+        self.step_timeout = step_timeout
+        self.tool_cache = tool_cache
+        self.result_token_budget = result_token_budget
+        self.result_shaping = result_shaping
+        self.server_name = ""
+        # 캐시 가능한(읽기 전용 또는 멱등) 도구 이름, list_tools 이후 채워진다
+        self._cacheable_tools: Optional[set[str]] = None
 
         self.genai_client = genai.Client(api_key=api_key)
 
@@ -57,11 +636,7 @@ class GeminiMCPClient:
         Returns:
             연결 성공 여부
         """
-        command = "python" if server_script_path.endswith(".py") else "node"
-
-        server_params = StdioServerParameters(
-            command=command, args=[server_script_path]
-        )
+        server_params = _server_params(server_script_path)
 
         stdio_transport = await self.exit_stack.enter_async_context(
             stdio_client(server_params)
@@ -77,6 +652,7 @@ class GeminiMCPClient:
                 print(f"서버에서 유효한 초기화 응답을 주지 않음")
                 return False
             print(f"✅ 서버 연결 성공: {result.serverInfo}")
+            self.server_name = result.serverInfo.name
             return True
         except (
             OSError,
@@ -87,8 +663,62 @@ class GeminiMCPClient:
             print(f"❌ 서버 연결 실패: {e}")
             return False
 
+    async def connect_to_pool(
+        self,
+        server_script_path: str,
+        size: int = 2,
+        max_size: int = 8,
+        pinned_tools: Optional[set[str]] = None,
+    ) -> bool:
+        """
+        동일한 MCP 서버 프로세스 여러 개로 구성된 세션 풀에 연결
+
+        Args:
+            server_script_path: MCP 서버 스크립트 경로
+            size: 시작 시 띄울 서버 프로세스 수
+            max_size: 부하가 몰릴 때 늘릴 수 있는 최대 프로세스 수
+            pinned_tools: 항상 같은 세션에서 실행해야 하는 상태 유지 도구
+
+        Returns:
+            연결 성공 여부
+        """
+        self.pool = MCPSessionPool(
+            _server_params(server_script_path),
+            size=size,
+            max_size=max_size,
+            pinned_tools=pinned_tools,
+        )
+        try:
+            result = await self.pool.start()
+            print(f"✅ 서버 풀 연결 성공 ({size}개): {result.serverInfo}")
+            self.server_name = result.serverInfo.name
+            return True
+        except (
+            OSError,
+            ConnectionError,
+            asyncio.TimeoutError,
+            mcp.McpError,
+        ) as e:
+            print(f"❌ 서버 풀 연결 실패: {e}")
+            await self.pool.close()
+            self.pool = None
+            return False
+
+    async def _call_server(
+        self, tool_name: str, arguments: Dict[str, Any], pin_key: Optional[str]
+    ) -> mcptypes.CallToolResult:
+        """세션 풀이 있으면 풀로, 없으면 단일 세션으로 도구 호출"""
+        if self.pool is not None:
+            return await self.pool.call_tool(tool_name, arguments, pin_key=pin_key)
+        return await cast(ClientSession, self.session).call_tool(
+            name=tool_name, arguments=arguments
+        )
+
     async def call_tool(
-        self, tool_name: str, arguments: Dict[str, Any]
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        pin_key: Optional[str] = None,
     ) -> Optional[mcptypes.CallToolResult]:
         """
         MCP 서버의 도구 호출
@@ -96,43 +726,104 @@ class GeminiMCPClient:
         Args:
             tool_name: 도구 이름
             arguments: 도구 인수
+            pin_key: 세션 풀 사용 시 같은 세션에 고정할 호출을 묶는 키
 
         Returns:
             도구 실행 결과
         """
-        if not self.session:
+        if not self.session and not self.pool:
             return
 
-        return await self.session.call_tool(name=tool_name, arguments=arguments)
+        if self.tool_cache is None:
+            return await self._call_server(tool_name, arguments, pin_key)
+
+        if self._cacheable_tools is None:
+            await self.get_available_tools()
+        if (
+            tool_name not in cast(set[str], self._cacheable_tools)
+            or self.tool_cache.ttl_for(tool_name) <= 0
+        ):
+            return await self._call_server(tool_name, arguments, pin_key)
+
+        key = ToolResultCache.make_key(self.server_name, tool_name, arguments)
+        cached = self.tool_cache.get(key)
+        if cached is not None:
+            print(f"♻️ 캐시 적중: {tool_name}/{arguments}")
+            return cached
+
+        result = await self._call_server(tool_name, arguments, pin_key)
+        if not result.isError:
+            self.tool_cache.put(key, result)
+        return result
 
     async def get_available_tools(self) -> list[mcptypes.Tool]:
         """사용 가능한 모든 도구 목록 반환"""
-        if self.session:
-            response = await self.session.list_tools()
+        if self.session or self.pool:
+            if self.pool is not None:
+                response = await self.pool.list_tools()
+            else:
+                response = await cast(ClientSession, self.session).list_tools()
             tools = response.tools
             print(f"✅ 서버 연결 성공, tools: {[tool.name for tool in tools]}")
+            self._cacheable_tools = {
+                tool.name
+                for tool in tools
+                if tool.annotations
+                and (tool.annotations.readOnlyHint or tool.annotations.idempotentHint)
+            }
             return tools
         return []
 
     async def cleanup(self):
         """모든 서버 프로세스 정리"""
         print("클라이언트 정리 중...")
+        if self.tool_cache is not None:
+            print(f"도구 캐시 통계: {self.tool_cache.stats()}")
+        if self.pool is not None:
+            print(f"세션 풀 통계: {self.pool.stats()}")
+            await self.pool.close()
         async with self.exit_stack:
             """"""
 
-    async def chat(self, message: str) -> str:
+    async def _run_tool_calls(self, tool_calls: List[ToolCall]) -> List[str]:
         """
-        Gemini와 채팅하며 필요시 MCP 도구 사용
+        한 단계에서 요청된 도구들을 동시에 실행
 
         Args:
-            message: 사용자 메시지
+            tool_calls: 실행할 도구 호출 목록
 
         Returns:
-            Gemini 응답
+            도구 호출 순서와 같은 순서의 결과 문자열 목록
         """
-        model = "gemini-2.5-flash-lite"
+        tasks = [
+            asyncio.create_task(self.call_tool(call.tool, call.arguments))
+            for call in tool_calls
+        ]
+        done, pending = await asyncio.wait(tasks, timeout=self.step_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
 
-        # 사용 가능한 도구 정보를 프롬프트에 포함
+        answers: List[str] = []
+        for call, task in zip(tool_calls, tasks):
+            if task not in done:
+                answers.append(f"시간 초과 ({self.step_timeout}초)")
+            elif task.exception() is not None:
+                answers.append(f"도구 실행 오류: {task.exception()}")
+            else:
+                shaped = shape_tool_result(
+                    task.result(), self.result_token_budget, self.result_shaping
+                )
+                if shaped.trimmed:
+                    print(f"✂️ {call.tool} {shaped.report()}")
+                    answers.append(f"{shaped.text}\n{shaped.report()}")
+                else:
+                    answers.append(shaped.text)
+        return answers
+
+    async def _system_prompt(self) -> str:
+        """사용 가능한 도구 정보를 포함한 시스템 프롬프트 생성"""
         tools_info: List[Any] = await self.get_available_tools()
         tools_description = "\n".join(
             [
@@ -141,7 +832,7 @@ class GeminiMCPClient:
             ]
         )
 
-        system_prompt = f"""
+        return f"""
 당신은 MCP(Model Context Protocol) 도구를 사용할 수 있는 AI 어시스턴트입니다.
 
 사용 가능한 도구들:
@@ -154,82 +845,120 @@ TOOL_CALL: {{
   "arguments": {{인수 딕셔너리}}
 }}
 
-도구 호출 결과를 받은 후 최종 답변을 제공하세요.
+서로 독립적인 도구는 한 번에 최대 {self.max_tools_per_step}개까지 TOOL_CALL 블록을 나열해 요청할 수 있습니다.
+도구 호출 결과를 받은 후 추가 도구가 필요하면 다시 요청하고, 그렇지 않으면 최종 답변을 제공하세요.
 """
+
+    async def chat_stream(self, message: str) -> AsyncIterator[str]:
+        """
+        Gemini와 채팅하며 필요시 MCP 도구 사용, 응답을 생성되는 대로 전달
+
+        모델이 더 이상 도구를 요청하지 않을 때까지 최대 max_steps 단계 동안
+        도구 호출과 응답을 반복한다. 한 단계에서 요청된 도구들은 동시에 실행된다.
+        TOOL_CALL 블록은 사용자에게 전달하지 않는다.
+
+        Args:
+            message: 사용자 메시지
+
+        Yields:
+            Gemini 응답 텍스트 조각
+        """
+        model = "gemini-2.5-flash-lite"
+        # 조각 경계에 걸친 "TOOL_CALL:" 표식이 새어 나가지 않도록 남겨 두는 길이
+        holdback = len(TOOL_CALL_MARKER) - 1
+
         try:
-            full_prompt = f"{system_prompt}\n\n사용자: {message}"
-            response: genai_types.GenerateContentResponse = (
-                self.genai_client.chats.create(model=model).send_message(
-                    message=full_prompt
-                )
-            )
+            system_prompt = await self._system_prompt()
+            chat = self.genai_client.aio.chats.create(model=model)
+            prompt = f"{system_prompt}\n\n사용자: {message}"
+            emitted_any = False
 
-            response_text = response.text
-            if response_text is None:
-                return "응답이 없습니다."
-
-            # 도구 호출이 필요한지 확인
-            if "TOOL_CALL:" in response_text:
-                # 도구 호출 부분 추출
-                tool_call_start = response_text.find("TOOL_CALL:")
-                tool_call_end = response_text.rfind("}") + 1
-                tool_call_json = response_text[
-                    tool_call_start + 10 : tool_call_end
-                ].strip()
-
-                try:
-                    tool_call = json.loads(tool_call_json.replace(r"\n", ""))
-                    tool_name = tool_call["tool"]
-                    arguments = tool_call["arguments"]
-
-                    print(f"🔧 도구 호출: {tool_name}/{arguments}")
-
-                    # 도구 실행
-                    tool_result: Optional[mcptypes.CallToolResult] = (
-                        await self.call_tool(tool_name, arguments)
+            for step in range(self.max_steps + 1):
+                if step == self.max_steps:
+                    prompt = (
+                        "도구 호출 단계 한도에 도달했습니다. 더 이상 도구를 요청하지 말고 "
+                        "지금까지의 결과로 사용자에게 최종 답변을 제공하세요."
                     )
-                    if tool_result is None:
-                        return "도구 호출에 실패했습니다."
 
-                    tool_answer = cast(
-                        mcptypes.TextContent, tool_result.content[0]
-                    ).text
+                response_text = ""
+                emitted = 0
+                separated = not emitted_any
+                async for chunk in await chat.send_message_stream(message=prompt):
+                    response_text += chunk.text or ""
+                    if TOOL_CALL_MARKER in response_text:
+                        end = response_text.find(TOOL_CALL_MARKER)
+                    else:
+                        end = max(emitted, len(response_text) - holdback)
+                    if end > emitted:
+                        if not separated:
+                            yield "\n\n"
+                            separated = True
+                        yield response_text[emitted:end]
+                        emitted = end
+                        emitted_any = True
 
-                    # 도구 결과를 포함한 최종 응답 생성
-                    final_prompt = f"""
-{system_prompt}
+                # 도구 호출이 필요한지 확인
+                tool_calls = (
+                    _parse_tool_calls(response_text) if step < self.max_steps else []
+                )
+                if not tool_calls:
+                    if len(response_text) > emitted:
+                        if not separated:
+                            yield "\n\n"
+                        yield response_text[emitted:]
+                    elif not emitted_any:
+                        yield "응답이 없습니다."
+                    return
+
+                skipped = tool_calls[self.max_tools_per_step :]
+                tool_calls = tool_calls[: self.max_tools_per_step]
+                print(
+                    f"🔧 [{step + 1}/{self.max_steps}] 도구 호출: "
+                    f"{[f'{call.tool}/{call.arguments}' for call in tool_calls]}"
+                )
 
-사용자: {message}
+                # 도구 실행
+                tool_answers = await self._run_tool_calls(tool_calls)
+
+                results = "\n".join(
+                    f"도구: {call.tool}\n인수: {call.arguments}\n결과: {answer}\n"
+                    for call, answer in zip(tool_calls, tool_answers)
+                )
+                if skipped:
+                    results += (
+                        f"\n(단계당 도구 호출 한도 {self.max_tools_per_step}개를 넘어 "
+                        f"{[call.tool for call in skipped]} 호출은 실행되지 않았습니다.)\n"
+                    )
 
+                # 도구 결과를 포함해 다음 단계 요청
+                prompt = f"""
 도구 호출 결과:
-도구: {tool_name}
-결과: {tool_answer}
- 
-위 결과를 바탕으로 사용자에게 최종 답변을 제공하세요.
+{results}
+위 결과를 바탕으로 추가 도구가 필요하면 TOOL_CALL 형식으로 요청하고, 그렇지 않으면 사용자에게 최종 답변을 제공하세요.
 """
 
-                    # self.genai_client.chats.create(model="gemini-1.5-turbo").send_message
-                    final_response = self.genai_client.chats.create(
-                        model=model
-                    ).send_message(message=final_prompt)
-
-                    return final_response.text or "최종 응답이 없습니다."
+        except Exception as e:
+            yield f"오류가 발생했습니다: {e}"
 
-                except json.JSONDecodeError:
-                    return response_text
+    async def chat(self, message: str) -> str:
+        """
+        Gemini와 채팅하며 필요시 MCP 도구 사용
 
-            return response_text
+        Args:
+            message: 사용자 메시지
 
-        except Exception as e:
-            return f"오류가 발생했습니다: {e}"
+        Returns:
+            Gemini 응답
+        """
+        return "".join([chunk async for chunk in self.chat_stream(message)])
 
 
 async def get_gemini_client() -> Union[None, GeminiMCPClient]:
 
     server_script_path = os.getenv("MCP_SERVER_SCRIPT")
     if server_script_path is None:
-        print("MCP_SERVER_SCRIPT 환경 변수가 설정되지 않았습니다.")
-        sys.exit(1)
+        # Streamlit에서는 백그라운드 루프 스레드에서 실행되므로 sys.exit 대신 예외를 던진다
+        raise RuntimeError("MCP_SERVER_SCRIPT 환경 변수가 설정되지 않았습니다.")
 
     api_key = os.getenv("GOOGLE_API_KEY")
     project_id = os.getenv("PROJECT_ID")
@@ -237,11 +966,46 @@ async def get_gemini_client() -> Union[None, GeminiMCPClient]:
         print("GENAI_API_KEY 또는 GENAI_PROJECT_ID 환경 변수가 설정되지 않았습니다.")
         return None
 
-    client = GeminiMCPClient(api_key=api_key, project_id=project_id)
-    if not await client.connect_to_server(
-        server_script_path=server_script_path  # MCP 서버 스크립트 경로로 변경
-    ):
-        raise ConnectionError("서버에 연결하지 못했습니다.")
+    # MCP_TOOL_CACHE_TTL이 설정되면 읽기 전용/멱등 도구 결과 캐시를 사용
+    tool_cache = None
+    cache_ttl = os.getenv("MCP_TOOL_CACHE_TTL")
+    if cache_ttl:
+        tool_cache = ToolResultCache(
+            max_entries=int(os.getenv("MCP_TOOL_CACHE_SIZE", "256")),
+            default_ttl=float(cache_ttl),
+        )
+
+    client = GeminiMCPClient(
+        api_key=api_key,
+        project_id=project_id,
+        tool_cache=tool_cache,
+        result_token_budget=int(os.getenv("MCP_RESULT_TOKEN_BUDGET", "2000")),
+        result_shaping=os.getenv("MCP_RESULT_SHAPING", "head_tail"),
+    )
+    # MCP_POOL_SIZE가 2 이상이면 동일한 서버 프로세스 여러 개로 세션 풀 구성
+    pool_size = int(os.getenv("MCP_POOL_SIZE", "1"))
+    connected = False
+    try:
+        if pool_size > 1:
+            pinned_tools = os.getenv("MCP_POOL_PINNED_TOOLS", "")
+            connected = await client.connect_to_pool(
+                server_script_path=server_script_path,
+                size=pool_size,
+                max_size=int(os.getenv("MCP_POOL_MAX_SIZE", str(pool_size * 2))),
+                pinned_tools={tool for tool in pinned_tools.split(",") if tool},
+            )
+        else:
+            connected = await client.connect_to_server(
+                server_script_path=server_script_path  # MCP 서버 스크립트 경로로 변경
+            )
+    except Exception as e:
+        raise ConnectionError(str(e) or type(e).__name__) from e
+    finally:
+        # 연결에 실패하면 이미 띄운 서버 프로세스와 스트림을 정리
+        if not connected:
+            await client.cleanup()
+    if not connected:
+        raise ConnectionError("MCP 서버 초기화에 실패했습니다.")
 
     return client
 
@@ -251,7 +1015,11 @@ async def main():
 
     load_dotenv()
 
-    client = await get_gemini_client()
+    try:
+        client = await get_gemini_client()
+    except (RuntimeError, ConnectionError) as e:
+        print(e)
+        return
     if not client:
         print("서버에 연결하지 못했습니다.")
     else:
@@ -1,7 +1,35 @@
+import base64
+import fnmatch
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+import numpy as np
 from fastmcp import FastMCP
 
 app = FastMCP(name="math_mcp")
 
+# list_files 페이지 크기
+LIST_PAGE_SIZE = 100
+LIST_MAX_PAGE_SIZE = 1000
+# 다음 페이지를 위해 열어 두는 디렉토리 스캔 수
+LIST_OPEN_SCANS = 16
+
+ENTRY_TYPES = ("file", "dir", "symlink", "other")
+
+# file_tree 인덱스에 보관하는 최대 디렉토리 수
+TREE_INDEX_MAX_DIRS = 50_000
+TREE_MAX_DEPTH = 32
+TREE_MAX_ENTRIES = 5_000
+# 디렉토리 mtime 해상도보다 짧은 시간 안에 스캔한 결과는 변경을 놓쳤을 수 있어 재사용하지 않음
+TREE_MTIME_SLACK_NS = 2_000_000_000
+
 
 @app.tool(
     name="add",
@@ -11,36 +39,576 @@ app = FastMCP(name="math_mcp")
         "properties": {"result": {"type": "integer"}},
         "required": ["result"],
     },
+    annotations={"readOnlyHint": True, "idempotentHint": True},
 )
 def add(x: int, y: int):
     """두 숫자의 합을 반환합니다."""
     return {"result": x + y}
 
 
+def _as_array(
+    values: Optional[list] = None,
+    values_b64: Optional[str] = None,
+    shape: Optional[list[int]] = None,
+    name: str = "values",
+) -> np.ndarray:
+    """
+    JSON 숫자 배열 또는 base64로 인코딩된 float64(little-endian) 버퍼를 배열로 변환
+
+    큰 입력은 values_b64로 보내면 JSON 숫자 파싱을 건너뛴다.
+    """
+    if values_b64 is not None:
+        raw = base64.b64decode(values_b64)
+        if len(raw) % 8:
+            raise ValueError(f"{name}_b64의 길이가 float64(8바이트)의 배수가 아닙니다.")
+        array = np.frombuffer(raw, dtype="<f8")
+        if shape is not None:
+            array = array.reshape(shape)
+    elif values is not None:
+        array = np.asarray(values, dtype=np.float64)
+    else:
+        raise ValueError(f"{name} 또는 {name}_b64 중 하나를 입력해야 합니다.")
+    if array.size == 0:
+        raise ValueError(f"{name}이 비어 있습니다.")
+    if not np.isfinite(array).all():
+        raise ValueError(f"{name}에 NaN 또는 무한대 값이 있습니다.")
+    return array
+
+
+_NUMBER_RESULT_SCHEMA = {
+    "type": "object",
+    "properties": {"result": {"type": "number"}, "count": {"type": "integer"}},
+    "required": ["result", "count"],
+}
+
+
+@app.tool(
+    name="array_sum",
+    description="숫자 배열의 합을 반환합니다. 큰 배열은 values_b64(float64 little-endian 버퍼의 base64)로 보낼 수 있습니다.",
+    output_schema=_NUMBER_RESULT_SCHEMA,
+    annotations={"readOnlyHint": True, "idempotentHint": True},
+)
+def array_sum(values: Optional[list[float]] = None, values_b64: Optional[str] = None):
+    """배열의 합을 반환합니다."""
+    array = _as_array(values, values_b64)
+    return {"result": float(array.sum()), "count": int(array.size)}
+
+
+@app.tool(
+    name="array_mean",
+    description="숫자 배열의 평균을 반환합니다. 큰 배열은 values_b64(float64 little-endian 버퍼의 base64)로 보낼 수 있습니다.",
+    output_schema=_NUMBER_RESULT_SCHEMA,
+    annotations={"readOnlyHint": True, "idempotentHint": True},
+)
+def array_mean(values: Optional[list[float]] = None, values_b64: Optional[str] = None):
+    """배열의 평균을 반환합니다."""
+    array = _as_array(values, values_b64)
+    return {"result": float(array.mean()), "count": int(array.size)}
+
+
+@app.tool(
+    name="array_percentile",
+    description="숫자 배열의 백분위수(0~100)를 반환합니다. 큰 배열은 values_b64로 보낼 수 있습니다.",
+    output_schema={
+        "type": "object",
+        "properties": {
+            "result": {
+                "type": "array",
+                "items": {"type": "number"},
+                "description": "q와 같은 순서의 백분위수",
+            },
+            "count": {"type": "integer"},
+        },
+        "required": ["result", "count"],
+    },
+    annotations={"readOnlyHint": True, "idempotentHint": True},
+)
+def array_percentile(
+    q: list[float],
+    values: Optional[list[float]] = None,
+    values_b64: Optional[str] = None,
+):
+    """배열의 백분위수를 반환합니다."""
+    array = _as_array(values, values_b64)
+    if any(p < 0 or p > 100 for p in q):
+        raise ValueError("q는 0 이상 100 이하여야 합니다.")
+    return {
+        "result": np.percentile(array, q).tolist(),
+        "count": int(array.size),
+    }
+
+
+@app.tool(
+    name="array_histogram",
+    description="숫자 배열의 히스토그램(구간별 개수와 구간 경계)을 반환합니다. 큰 배열은 values_b64로 보낼 수 있습니다.",
+    output_schema={
+        "type": "object",
+        "properties": {
+            "counts": {"type": "array", "items": {"type": "integer"}},
+            "bin_edges": {"type": "array", "items": {"type": "number"}},
+        },
+        "required": ["counts", "bin_edges"],
+    },
+    annotations={"readOnlyHint": True, "idempotentHint": True},
+)
+def array_histogram(
+    values: Optional[list[float]] = None,
+    values_b64: Optional[str] = None,
+    bins: int = 10,
+    range_min: Optional[float] = None,
+    range_max: Optional[float] = None,
+):
+    """배열의 히스토그램을 반환합니다."""
+    array = _as_array(values, values_b64)
+    if not 1 <= bins <= 10_000:
+        raise ValueError("bins는 1 이상 10000 이하여야 합니다.")
+    value_range = None
+    if range_min is not None or range_max is not None:
+        value_range = (
+            array.min() if range_min is None else range_min,
+            array.max() if range_max is None else range_max,
+        )
+    counts, bin_edges = np.histogram(array, bins=bins, range=value_range)
+    return {"counts": counts.tolist(), "bin_edges": bin_edges.tolist()}
+
+
+@app.tool(
+    name="dot",
+    description="두 벡터의 내적을 반환합니다. 큰 벡터는 a_b64, b_b64로 보낼 수 있습니다.",
+    output_schema={
+        "type": "object",
+        "properties": {"result": {"type": "number"}},
+        "required": ["result"],
+    },
+    annotations={"readOnlyHint": True, "idempotentHint": True},
+)
+def dot(
+    a: Optional[list[float]] = None,
+    b: Optional[list[float]] = None,
+    a_b64: Optional[str] = None,
+    b_b64: Optional[str] = None,
+):
+    """두 벡터의 내적을 반환합니다."""
+    left = _as_array(a, a_b64, name="a")
+    right = _as_array(b, b_b64, name="b")
+    if left.ndim != 1 or left.shape != right.shape:
+        raise ValueError(f"길이가 같은 1차원 벡터가 필요합니다: {left.shape}, {right.shape}")
+    return {"result": float(np.dot(left, right))}
+
+
+@app.tool(
+    name="matmul",
+    description=(
+        "두 행렬의 곱을 반환합니다. 큰 행렬은 a_b64/b_b64(float64 버퍼의 base64)와 "
+        "a_shape/b_shape([행, 열])로 보낼 수 있습니다."
+    ),
+    output_schema={
+        "type": "object",
+        "properties": {
+            "result": {
+                "type": "array",
+                "items": {"type": "array", "items": {"type": "number"}},
+            },
+            "shape": {"type": "array", "items": {"type": "integer"}},
+        },
+        "required": ["result", "shape"],
+    },
+    annotations={"readOnlyHint": True, "idempotentHint": True},
+)
+def matmul(
+    a: Optional[list[list[float]]] = None,
+    b: Optional[list[list[float]]] = None,
+    a_b64: Optional[str] = None,
+    b_b64: Optional[str] = None,
+    a_shape: Optional[list[int]] = None,
+    b_shape: Optional[list[int]] = None,
+):
+    """두 행렬의 곱을 반환합니다."""
+    left = _as_array(a, a_b64, a_shape, name="a")
+    right = _as_array(b, b_b64, b_shape, name="b")
+    if left.ndim != 2 or right.ndim != 2 or left.shape[1] != right.shape[0]:
+        raise ValueError(f"곱할 수 없는 행렬 크기입니다: {left.shape}, {right.shape}")
+    product = left @ right
+    return {"result": product.tolist(), "shape": list(product.shape)}
+
+
+@dataclass
+class _Scan:
+    """다음 페이지 요청까지 열어 두는 디렉토리 스캔"""
+
+    scandir: Any
+    entries: Iterator[os.DirEntry]
+    offset: int
+
+
+_scans: "OrderedDict[str, _Scan]" = OrderedDict()
+_scans_lock = threading.Lock()
+
+
+def _entry_type(entry: os.DirEntry) -> str:
+    """DirEntry의 캐시된 d_type으로 종류 판별 (추가 stat 없음)"""
+    if entry.is_symlink():
+        return "symlink"
+    if entry.is_dir(follow_symlinks=False):
+        return "dir"
+    if entry.is_file(follow_symlinks=False):
+        return "file"
+    return "other"
+
+
+def _entry_info(entry: os.DirEntry, entry_type: str) -> dict:
+    """항목 메타데이터 (DirEntry.stat은 항목당 한 번만 조회하고 캐시됨)"""
+    stat = entry.stat(follow_symlinks=False)
+    return {
+        "name": entry.name,
+        "type": entry_type,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+    }
+
+
+def _encode_cursor(state: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> dict:
+    return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+
+
+def _open_scan(
+    directory: str, pattern: Optional[str], entry_type: Optional[str], skip: int
+) -> _Scan:
+    """디렉토리 스캔을 열고 필터를 스캔 중에 적용, 이미 반환한 skip개는 건너뜀"""
+    scandir = os.scandir(directory)
+
+    def matching() -> Iterator[os.DirEntry]:
+        for entry in scandir:
+            if pattern and not fnmatch.fnmatch(entry.name, pattern):
+                continue
+            if entry_type and _entry_type(entry) != entry_type:
+                continue
+            yield entry
+
+    entries = matching()
+    for _ in itertools.islice(entries, skip):
+        pass
+    return _Scan(scandir=scandir, entries=entries, offset=skip)
+
+
+def _close_scan(scan: _Scan) -> None:
+    scan.scandir.close()
+
+
 @app.tool(
     name="list_files",
-    description="파일목록을 출력한다",
+    description=(
+        "디렉토리의 파일목록을 페이지 단위로 출력한다. "
+        "결과에 next_cursor가 있으면 cursor 인수로 넘겨 다음 페이지를 조회한다. "
+        "pattern(glob)과 entry_type(file, dir, symlink, other)으로 필터링할 수 있다."
+    ),
     output_schema={
         "type": "object",
         "properties": {
             "result": {
                 "type": "array",
-                "items": {"type": "string"},
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "type": {"type": "string", "enum": list(ENTRY_TYPES)},
+                        "size": {"type": "integer"},
+                        "mtime": {"type": "number"},
+                    },
+                    "required": ["name", "type", "size", "mtime"],
+                },
                 "description": "파일 목록",
+            },
+            "next_cursor": {
+                "type": ["string", "null"],
+                "description": "다음 페이지 커서 (마지막 페이지면 null)",
+            },
+            "error": {"type": "string"},
+        },
+        "required": ["result", "next_cursor"],
+    },
+    annotations={"readOnlyHint": True},
+)
+def list_files(
+    directory: str = ".",
+    cursor: Optional[str] = None,
+    page_size: int = LIST_PAGE_SIZE,
+    pattern: Optional[str] = None,
+    entry_type: Optional[str] = None,
+):
+    """지정된 디렉토리의 파일 목록을 페이지 단위로 반환합니다."""
+    page_size = max(1, min(page_size, LIST_MAX_PAGE_SIZE))
+    try:
+        if entry_type is not None and entry_type not in ENTRY_TYPES:
+            raise ValueError(f"지원하지 않는 entry_type: {entry_type}")
+
+        scan_id = None
+        if cursor:
+            # 커서에 담긴 조건으로 이어서 조회 (인수로 받은 조건은 무시)
+            state = _decode_cursor(cursor)
+            scan_id = state["id"]
+            directory = state["directory"]
+            pattern = state["pattern"]
+            entry_type = state["entry_type"]
+            with _scans_lock:
+                scan = _scans.pop(scan_id, None)
+            # 열린 스캔이 없거나(만료) 위치가 다르면 처음부터 다시 스캔하며 건너뜀
+            if scan is None or scan.offset != state["offset"]:
+                if scan is not None:
+                    _close_scan(scan)
+                scan = _open_scan(directory, pattern, entry_type, state["offset"])
+        else:
+            scan = _open_scan(directory, pattern, entry_type, 0)
+
+        files = []
+        for entry in scan.entries:
+            try:
+                files.append(_entry_info(entry, _entry_type(entry)))
+            except FileNotFoundError:
+                # 스캔 중에 삭제된 항목은 건너뜀
+                continue
+            if len(files) == page_size:
+                break
+        scan.offset += len(files)
+
+        # 다음 항목이 있는지 미리 확인하고 스캔에 되돌려 둠
+        peeked = next(scan.entries, None)
+        if peeked is None:
+            _close_scan(scan)
+            return {"result": files, "next_cursor": None}
+        scan.entries = itertools.chain([peeked], scan.entries)
+
+        scan_id = scan_id or uuid.uuid4().hex
+        with _scans_lock:
+            _scans[scan_id] = scan
+            while len(_scans) > LIST_OPEN_SCANS:
+                _close_scan(_scans.popitem(last=False)[1])
+        next_cursor = _encode_cursor(
+            {
+                "id": scan_id,
+                "offset": scan.offset,
+                "directory": directory,
+                "pattern": pattern,
+                "entry_type": entry_type,
             }
+        )
+        return {"result": files, "next_cursor": next_cursor}
+    except Exception as e:
+        return {"result": [], "next_cursor": None, "error": str(e)}
+
+
+@dataclass
+class _DirIndex:
+    """디렉토리 하나의 스캔 결과 (이름 → (종류, 크기, mtime))"""
+
+    mtime_ns: int
+    scanned_ns: int
+    entries: dict[str, tuple[str, int, float]]
+
+
+_tree_index: "OrderedDict[str, _DirIndex]" = OrderedDict()
+_tree_lock = threading.Lock()
+
+
+def _index_dir(path: str, stats: dict) -> _DirIndex:
+    """
+    디렉토리 인덱스를 반환, 디렉토리 mtime이 그대로면 다시 스캔하지 않음
+
+    디렉토리 mtime은 항목 추가/삭제/이름 변경 시에만 바뀌므로,
+    이미 있던 파일의 내용 변경(크기, mtime)은 디렉토리가 다시 스캔될 때 반영된다.
+    """
+    mtime_ns = os.stat(path).st_mtime_ns
+    with _tree_lock:
+        cached = _tree_index.get(path)
+        if (
+            cached is not None
+            and cached.mtime_ns == mtime_ns
+            and cached.scanned_ns - mtime_ns > TREE_MTIME_SLACK_NS
+        ):
+            _tree_index.move_to_end(path)
+            stats["reused"] += 1
+            return cached
+
+    scanned_ns = time.time_ns()
+    entries = {}
+    with os.scandir(path) as scandir:
+        for entry in scandir:
+            entry_type = _entry_type(entry)
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            entries[entry.name] = (entry_type, stat.st_size, stat.st_mtime)
+    index = _DirIndex(mtime_ns=mtime_ns, scanned_ns=scanned_ns, entries=entries)
+    stats["scanned"] += 1
+
+    with _tree_lock:
+        _tree_index[path] = index
+        _tree_index.move_to_end(path)
+        while len(_tree_index) > TREE_INDEX_MAX_DIRS:
+            _tree_index.popitem(last=False)
+    return index
+
+
+@app.tool(
+    name="file_tree",
+    description=(
+        "디렉토리 트리를 한 번에 조회한다. 루트 아래로 max_depth 단계까지 내려가며 "
+        "(0이면 루트 디렉토리만) pattern(glob, 상대 경로 기준)과 일치하는 파일을 나열하고, "
+        "디렉토리별/전체 파일 크기 합계를 함께 반환한다. "
+        "읽을 수 없는 하위 디렉토리는 건너뛰고 errors에 기록한다."
+    ),
+    output_schema={
+        "type": "object",
+        "properties": {
+            "result": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "path": {"type": "string"},
+                        "type": {"type": "string", "enum": list(ENTRY_TYPES)},
+                        "size": {
+                            "type": "integer",
+                            "description": "파일 크기 또는 디렉토리 하위 일치 파일 크기 합계",
+                        },
+                        "mtime": {"type": "number"},
+                    },
+                    "required": ["path", "type", "size", "mtime"],
+                },
+                "description": "트리 항목 (전위 순회 순서)",
+            },
+            "total_files": {"type": "integer"},
+            "total_dirs": {"type": "integer"},
+            "total_size": {"type": "integer"},
+            "truncated": {
+                "type": "boolean",
+                "description": "max_entries를 넘어 일부 항목을 생략했는지 여부",
+            },
+            "index": {
+                "type": "object",
+                "properties": {
+                    "scanned": {"type": "integer"},
+                    "reused": {"type": "integer"},
+                },
+            },
+            "errors": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "path": {"type": "string"},
+                        "error": {"type": "string"},
+                    },
+                    "required": ["path", "error"],
+                },
+                "description": "읽지 못해 건너뛴 하위 디렉토리",
+            },
+            "error": {"type": "string"},
         },
-        "required": ["result"],
+        "required": [
+            "result",
+            "total_files",
+            "total_dirs",
+            "total_size",
+            "truncated",
+            "errors",
+        ],
     },
+    annotations={"readOnlyHint": True},
 )
-def list_files(directory: str = "."):
-    """지정된 디렉토리의 파일 목록을 반환합니다."""
-    import os
+def file_tree(
+    directory: str = ".",
+    max_depth: int = 3,
+    pattern: Optional[str] = None,
+    max_entries: int = 1000,
+):
+    """디렉토리 트리와 크기 합계를 반환합니다."""
+    max_depth = max(0, min(max_depth, TREE_MAX_DEPTH))
+    max_entries = max(0, min(max_entries, TREE_MAX_ENTRIES))
+    stats = {"scanned": 0, "reused": 0}
+    items: list[dict] = []
+    errors: list[dict] = []
+    totals = {"files": 0, "dirs": 0}
+    truncated = False
+
+    def walk(path: str, relative: str, depth: int) -> int:
+        nonlocal truncated
+        try:
+            index = _index_dir(path, stats)
+        except OSError as e:
+            # 루트를 읽지 못하면 전체 실패, 하위 디렉토리는 기록하고 건너뜀
+            if not relative:
+                raise
+            errors.append({"path": relative, "error": str(e)})
+            return 0
+        subtotal = 0
+        for name, (entry_type, size, mtime) in sorted(index.entries.items()):
+            entry_path = f"{relative}/{name}" if relative else name
+            if entry_type == "dir":
+                totals["dirs"] += 1
+                item = None
+                if not pattern:
+                    if len(items) < max_entries:
+                        item = {
+                            "path": entry_path,
+                            "type": "dir",
+                            "size": 0,
+                            "mtime": mtime,
+                        }
+                        items.append(item)
+                    else:
+                        truncated = True
+                if depth < max_depth:
+                    dir_size = walk(os.path.join(path, name), entry_path, depth + 1)
+                    subtotal += dir_size
+                    if item is not None:
+                        item["size"] = dir_size
+                continue
+            if pattern and not fnmatch.fnmatch(entry_path, pattern):
+                continue
+            totals["files"] += 1
+            if entry_type == "file":
+                subtotal += size
+            if len(items) < max_entries:
+                items.append(
+                    {
+                        "path": entry_path,
+                        "type": entry_type,
+                        "size": size,
+                        "mtime": mtime,
+                    }
+                )
+            else:
+                truncated = True
+        return subtotal
 
     try:
-        files = os.listdir(directory)
-        return {"result": files}
+        total_size = walk(directory, "", 0)
+        return {
+            "result": items,
+            "total_files": totals["files"],
+            "total_dirs": totals["dirs"],
+            "total_size": total_size,
+            "truncated": truncated,
+            "index": stats,
+            "errors": errors,
+        }
     except Exception as e:
-        return {"result": [f"Error: {str(e)}"]}
+        return {
+            "result": [],
+            "total_files": 0,
+            "total_dirs": 0,
+            "total_size": 0,
+            "truncated": False,
+            "index": stats,
+            "errors": errors,
+            "error": str(e),
+        }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+gemini CLI 백엔드와 상주 SDK 워커 풀 백엔드의 호출당 지연 시간 비교
+
+사용 예:
+    python benchmark_backends.py --calls 20 --concurrency 4
+    python benchmark_backends.py --overhead   # 네트워크 없이 고정 비용만 측정
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from dotenv import load_dotenv
+
+import mcp_server2
+
+
+async def measure(
+    call: Callable[[], Awaitable[object]], calls: int, concurrency: int
+) -> Dict[str, float]:
+    """call을 calls번 실행하고 지연 시간 통계(ms)를 반환"""
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed():
+        async with semaphore:
+            started = time.perf_counter()
+            await call()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[timed() for _ in range(calls)])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "calls_per_s": calls / elapsed,
+    }
+
+
+class NoopWorkerPool(mcp_server2.GeminiWorkerPool):
+    """모델 호출 없이 대기열 전달 비용만 측정하는 워커 풀"""
+
+    async def _call(self, worker, kind, args, on_output=None) -> str:
+        return ""
+
+
+async def run(args: argparse.Namespace) -> None:
+    query_args = {"query": args.query, "model": args.model}
+    results: Dict[str, Dict[str, float]] = {}
+
+    if args.overhead:
+        # CLI: 프로세스 시작과 종료 비용 / SDK: 상주 워커 대기열 전달 비용
+        results["cli (process spawn)"] = await measure(
+            lambda: mcp_server2.run_cli([mcp_server2.GEMINI_CLI, "--version"], 30),
+            args.calls,
+            args.concurrency,
+        )
+        pool = NoopWorkerPool(size=args.concurrency)
+        await pool.start()
+        results["sdk pool (dispatch)"] = await measure(
+            lambda: pool.submit("query", query_args, 30), args.calls, args.concurrency
+        )
+        await pool.close()
+    else:
+        results["cli"] = await measure(
+            lambda: mcp_server2.run_cli(
+                mcp_server2.cli_command("query", query_args), 60
+            ),
+            args.calls,
+            args.concurrency,
+        )
+        pool = mcp_server2.GeminiWorkerPool(size=args.concurrency)
+        await pool.start()
+        results["sdk pool"] = await measure(
+            lambda: pool.submit("query", query_args, 60), args.calls, args.concurrency
+        )
+        await pool.close()
+
+    print(f"{'backend':<22}{'mean':>10}{'p50':>10}{'p95':>10}{'calls/s':>10}")
+    for name, stats in results.items():
+        print(
+            f"{name:<22}{stats['mean_ms']:>10.1f}{stats['p50_ms']:>10.1f}"
+            f"{stats['p95_ms']:>10.1f}{stats['calls_per_s']:>10.2f}"
+        )
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--query", default="한 문장으로 자기소개를 해주세요.")
+    parser.add_argument("--model", default="gemini-pro")
+    parser.add_argument(
+        "--overhead", action="store_true", help="모델 호출 없이 호출당 고정 비용만 측정"
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,26 @@
 #!/usr/bin/env python3
 import asyncio
+import codecs
+import hashlib
 import json
-import sys
+import mimetypes
+import os
+import signal
+import sqlite3
 import subprocess
-from typing import Any, Dict, List, Optional
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, cast
+import httpx
+from google import genai
+from google.genai import errors as genai_errors
+from google.genai import types as genai_types
+from PIL import Image, ImageOps
+import anyio
 from mcp.server import Server
 from mcp.types import (
     CallToolRequest,
@@ -17,6 +34,58 @@ import mcp.server.stdio
 
 app = Server("gemini-cli")
 
+# 실행 백엔드: cli(요청마다 gemini CLI 프로세스 실행) 또는 sdk(상주 워커 풀에서 google-genai 호출)
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "cli")
+GEMINI_CLI = os.getenv("GEMINI_CLI", "gemini")
+SDK_DEFAULT_MODEL = os.getenv("GEMINI_SDK_MODEL", "gemini-2.5-flash-lite")
+SDK_WORKERS = int(os.getenv("GEMINI_SDK_WORKERS", "4"))
+SDK_QUEUE_SIZE = int(os.getenv("GEMINI_SDK_QUEUE_SIZE", "64"))
+SDK_HEALTH_INTERVAL = float(os.getenv("GEMINI_SDK_HEALTH_INTERVAL", "60"))
+# 대화 기록을 보관하는 채팅 세션 수 (넘으면 가장 오래 쓰지 않은 세션부터 제거)
+SDK_CHAT_SESSIONS = int(os.getenv("GEMINI_SDK_CHAT_SESSIONS", "256"))
+# 연속 실패가 이 횟수에 이르면 워커를 비정상으로 보고 헬스 체크가 복구할 때까지 쉬게 한다
+# (연결 오류, 시간 초과, 5xx만 센다. 잘못된 요청이나 4xx는 워커 상태와 무관)
+SDK_MAX_FAILURES = 3
+SDK_RECOVERY_INTERVAL = 5.0
+# CLI 전용 모델명을 SDK 모델로 대응
+SDK_MODEL_ALIASES = {"gemini-pro": SDK_DEFAULT_MODEL}
+# 진행 알림 최소 간격(초), 그 사이에 나온 출력은 모아서 한 번에 보낸다
+PROGRESS_INTERVAL = 0.25
+
+OutputCallback = Callable[[str], Awaitable[None]]
+
+# 이미지 전처리: 긴 변이 IMAGE_MAX_SIZE를 넘으면 줄여서 내용 해시로 디스크에 보관
+IMAGE_CACHE_DIR = os.getenv(
+    "GEMINI_IMAGE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "gemini-cli-mcp", "images"),
+)
+IMAGE_MAX_SIZE = int(os.getenv("GEMINI_IMAGE_MAX_SIZE", "1536"))
+# (이미지 해시, 프롬프트) → 분석 결과 메모 크기
+ANALYSIS_MEMO_SIZE = 256
+# (경로, 크기, 수정 시각) → 내용 해시 메모 크기
+IMAGE_HASH_MEMO_SIZE = 4096
+
+# gemini_query 응답 캐시 (GEMINI_RESPONSE_CACHE에 SQLite 파일 경로를 지정하면 사용)
+RESPONSE_CACHE_PATH = os.getenv("GEMINI_RESPONSE_CACHE")
+RESPONSE_CACHE_TTL = float(os.getenv("GEMINI_RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_SIZE = int(os.getenv("GEMINI_RESPONSE_CACHE_SIZE", "1000"))
+
+# 도구별 (동시 실행 수, 대기열 길이) 기본값, <도구명 대문자>_LIMIT=동시실행:대기열 로 변경
+# 예: GEMINI_IMAGE_ANALYSIS_LIMIT=1:4
+TOOL_LIMITS = {
+    "gemini_query": (8, 32),
+    "gemini_chat": (8, 32),
+    "gemini_image_analysis": (2, 8),
+}
+# 요청 종류 → 도구명
+KIND_TOOLS = {
+    "query": "gemini_query",
+    "chat": "gemini_chat",
+    "analyze": "gemini_image_analysis",
+}
+# 지연 시간 통계에 보관하는 최근 표본 수
+STATS_SAMPLES = 1000
+
 
 @app.list_tools()
 async def list_tools() -> List[Tool]:
@@ -33,6 +102,11 @@ async def list_tools() -> List[Tool]:
                         "description": "사용할 Gemini 모델 (기본값: gemini-pro)",
                         "default": "gemini-pro",
                     },
+                    "no_cache": {
+                        "type": "boolean",
+                        "description": "응답 캐시를 건너뛰고 새로 질의 (기본값: false)",
+                        "default": False,
+                    },
                 },
                 "required": ["query"],
             },
@@ -71,63 +145,857 @@ async def list_tools() -> List[Tool]:
                 "required": ["image_path", "prompt"],
             },
         ),
+        Tool(
+            name="server_stats",
+            description="도구별 동시 실행/대기열 상태와 대기·실행 시간, 캐시 통계 조회",
+            inputSchema={"type": "object", "properties": {}},
+        ),
     ]
 
 
+def _new_process_group() -> Dict[str, Any]:
+    """CLI와 그 하위 프로세스를 한 번에 종료할 수 있도록 새 프로세스 그룹으로 실행"""
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+async def kill_process_tree(process: asyncio.subprocess.Process) -> None:
+    """프로세스와 그 하위 프로세스 트리를 강제 종료하고 회수"""
+    if process.returncode is not None:
+        return
+    # 취소된 작업 안에서 호출되므로 정리 과정이 다시 취소되지 않도록 보호
+    with anyio.CancelScope(shield=True):
+        if sys.platform == "win32":
+            killer = await asyncio.create_subprocess_exec(
+                "taskkill",
+                "/T",
+                "/F",
+                "/PID",
+                str(process.pid),
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            await killer.wait()
+        else:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+
+
+async def run_cli(
+    cmd: List[str], timeout: float, on_output: Optional[OutputCallback] = None
+) -> tuple[int, str, str]:
+    """
+    CLI를 비동기 하위 프로세스로 실행하고 결과를 반환
+
+    on_output이 주어지면 표준 출력을 읽는 대로 조각 단위로 전달한다.
+    시간 초과 시 프로세스를 종료(kill)하고 asyncio.TimeoutError를 다시 발생시킨다.
+
+    Returns:
+        (종료 코드, 표준 출력, 표준 에러)
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        **_new_process_group(),
+    )
+
+    async def read_incrementally() -> tuple[bytes, bytes]:
+        stdout_reader = cast(asyncio.StreamReader, process.stdout)
+        stderr_reader = cast(asyncio.StreamReader, process.stderr)
+        stderr_task = asyncio.create_task(stderr_reader.read())
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        chunks: List[bytes] = []
+        try:
+            while chunk := await stdout_reader.read(4096):
+                chunks.append(chunk)
+                if text := decoder.decode(chunk):
+                    await cast(OutputCallback, on_output)(text)
+            if text := decoder.decode(b"", final=True):
+                await cast(OutputCallback, on_output)(text)
+            stderr = await stderr_task
+        finally:
+            stderr_task.cancel()
+        await process.wait()
+        return b"".join(chunks), stderr
+
+    try:
+        if on_output is None:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        else:
+            stdout, stderr = await asyncio.wait_for(read_incrementally(), timeout)
+    except BaseException:
+        # 시간 초과, 요청 취소, 클라이언트 연결 종료 시 CLI가 띄운 하위 프로세스까지 정리
+        await kill_process_tree(process)
+        raise
+    return (
+        cast(int, process.returncode),
+        stdout.decode(errors="replace"),
+        stderr.decode(errors="replace"),
+    )
+
+
+class ProgressForwarder:
+    """
+    실행 중 출력을 MCP 진행 알림(notifications/progress)으로 전달
+
+    progress는 지금까지 받은 출력 글자 수, message는 마지막 알림 이후 새로 나온 출력이다.
+    알림은 PROGRESS_INTERVAL 간격으로 모아 보낸다.
+    """
+
+    def __init__(self, session: Any, progress_token: str | int, request_id: Any):
+        self.session = session
+        self.progress_token = progress_token
+        self.request_id = str(request_id)
+        self.received = 0
+        self.pending = ""
+        self.last_sent = 0.0
+
+    @classmethod
+    def for_current_request(cls) -> Optional["ProgressForwarder"]:
+        """클라이언트가 progressToken을 보낸 요청이면 전달기를 만든다"""
+        try:
+            ctx = app.request_context
+        except LookupError:
+            return None
+        if ctx.meta is None or ctx.meta.progressToken is None:
+            return None
+        return cls(ctx.session, ctx.meta.progressToken, ctx.request_id)
+
+    async def __call__(self, text: str) -> None:
+        self.received += len(text)
+        self.pending += text
+        if time.monotonic() - self.last_sent >= PROGRESS_INTERVAL:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self.pending:
+            return
+        message, self.pending = self.pending, ""
+        self.last_sent = time.monotonic()
+        await self.session.send_progress_notification(
+            self.progress_token,
+            self.received,
+            message=message,
+            related_request_id=self.request_id,
+        )
+
+
+def cli_result(returncode: int, stdout: str, stderr: str) -> CallToolResult:
+    if returncode == 0:
+        return CallToolResult(content=[TextContent(type="text", text=stdout.strip())])
+    return CallToolResult(
+        content=[TextContent(type="text", text=f"오류: {stderr}")],
+        isError=True,
+    )
+
+
+def cli_command(kind: str, args: Dict[str, str]) -> List[str]:
+    """요청 종류별 gemini CLI 명령 구성"""
+    if kind == "query":
+        return [GEMINI_CLI, "query", "--model", args["model"], args["query"]]
+    if kind == "chat":
+        return [GEMINI_CLI, "chat", "--session", args["session_id"], args["message"]]
+    if kind == "analyze":
+        return [GEMINI_CLI, "analyze", "--image", args["image_path"], args["prompt"]]
+    raise ValueError(f"알 수 없는 요청 종류: {kind}")
+
+
+@dataclass
+class SDKJob:
+    """워커 풀 대기열의 요청"""
+
+    kind: str
+    args: Dict[str, str]
+    future: asyncio.Future
+    on_output: Optional[OutputCallback] = None
+
+
+@dataclass
+class ChatSession:
+    """채팅 세션의 대화 기록 (특정 워커의 클라이언트에 묶이지 않음)"""
+
+    history: List[Any] = field(default_factory=list)
+    # 같은 세션의 메시지는 순서대로 처리해 기록이 엇갈리지 않게 한다
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+@dataclass
+class SDKWorker:
+    """google-genai 클라이언트를 하나 보유한 상주 워커"""
+
+    index: int
+    client: genai.Client
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    calls: int = 0
+    # failures는 워커 상태에 영향을 주는 오류, errors는 요청 자체의 오류
+    failures: int = 0
+    errors: int = 0
+    consecutive_failures: int = 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.ready.is_set()
+
+
+def is_worker_failure(error: BaseException) -> bool:
+    """워커의 연결/서버 쪽 오류인지 판별 (요청 자체가 잘못된 경우는 False)"""
+    if isinstance(error, genai_errors.APIError):
+        return not isinstance(error, genai_errors.ClientError)
+    return isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError))
+
+
+class GeminiWorkerPool:
+    """
+    상주 google-genai 클라이언트 워커 풀
+
+    요청마다 CLI 프로세스를 띄우고 인증하는 대신, 연결과 인증 상태를 유지하는 워커들이
+    제한된 대기열에서 요청을 꺼내 처리한다. 헬스 체크에 실패하거나 연속으로 실패한
+    워커는 클라이언트를 다시 만들고 복구될 때까지 요청을 받지 않는다.
+    채팅은 대화 기록만 풀에 보관하고, 메시지마다 그 요청을 맡은 워커의 클라이언트로
+    채팅을 다시 만들어 보낸다.
+    결과는 CLI와 같은 (종료 코드, 표준 출력, 표준 에러) 형태로 반환한다.
+    """
+
+    def __init__(
+        self,
+        size: int = SDK_WORKERS,
+        queue_size: int = SDK_QUEUE_SIZE,
+        health_interval: float = SDK_HEALTH_INTERVAL,
+        chat_sessions: int = SDK_CHAT_SESSIONS,
+    ):
+        self.size = size
+        self.health_interval = health_interval
+        self.chat_sessions = chat_sessions
+        self.queue: asyncio.Queue[SDKJob] = asyncio.Queue(maxsize=queue_size)
+        self.workers: List[SDKWorker] = []
+        self.chats: OrderedDict[str, ChatSession] = OrderedDict()
+        self._tasks: List[asyncio.Task] = []
+        self._degraded = asyncio.Event()
+
+    def _new_client(self) -> genai.Client:
+        return genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+
+    async def start(self) -> None:
+        for index in range(self.size):
+            worker = SDKWorker(index=index, client=self._new_client())
+            worker.ready.set()
+            self.workers.append(worker)
+            self._tasks.append(asyncio.create_task(self._work(worker)))
+        self._tasks.append(asyncio.create_task(self._health_loop()))
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def submit(
+        self,
+        kind: str,
+        args: Dict[str, str],
+        timeout: float,
+        on_output: Optional[OutputCallback] = None,
+    ) -> tuple[int, str, str]:
+        """요청을 대기열에 넣고 결과를 기다림 (대기 시간도 timeout에 포함)"""
+        future = asyncio.get_running_loop().create_future()
+        deadline = time.monotonic() + timeout
+        job = SDKJob(kind, args, future, on_output)
+        await asyncio.wait_for(self.queue.put(job), timeout)
+        # 시간 초과로 future가 취소되면 처리 중인 워커의 호출도 취소된다
+        return await asyncio.wait_for(future, max(0.0, deadline - time.monotonic()))
+
+    async def _call(
+        self,
+        worker: SDKWorker,
+        kind: str,
+        args: Dict[str, str],
+        on_output: Optional[OutputCallback] = None,
+    ) -> str:
+        """요청을 실행, on_output이 있으면 스트리밍으로 받아 조각마다 전달"""
+        model = SDK_MODEL_ALIASES.get(args.get("model", ""), args.get("model"))
+        if kind == "chat":
+            return await self._chat(worker, args, on_output)
+        if kind == "query":
+            model = model or SDK_DEFAULT_MODEL
+            contents: Any = args["query"]
+        elif kind == "analyze":
+            model = SDK_DEFAULT_MODEL
+            with open(args["image_path"], "rb") as f:
+                data = f.read()
+            mime_type = mimetypes.guess_type(args["image_path"])[0] or "image/png"
+            contents = [
+                genai_types.Part.from_bytes(data=data, mime_type=mime_type),
+                args["prompt"],
+            ]
+        else:
+            raise ValueError(f"알 수 없는 요청 종류: {kind}")
+        if on_output is None:
+            response = await worker.client.aio.models.generate_content(
+                model=model, contents=contents
+            )
+            return response.text or ""
+        stream = await worker.client.aio.models.generate_content_stream(
+            model=model, contents=contents
+        )
+        return await self._collect(stream, on_output)
+
+    @staticmethod
+    async def _collect(stream: Any, on_output: OutputCallback) -> str:
+        texts: List[str] = []
+        async for chunk in stream:
+            if chunk.text:
+                texts.append(chunk.text)
+                await on_output(chunk.text)
+        return "".join(texts)
+
+    def _chat_session(self, session_id: str) -> ChatSession:
+        session = self.chats.get(session_id)
+        if session is None:
+            session = self.chats[session_id] = ChatSession()
+            while len(self.chats) > self.chat_sessions:
+                self.chats.popitem(last=False)
+        self.chats.move_to_end(session_id)
+        return session
+
+    async def _chat(
+        self,
+        worker: SDKWorker,
+        args: Dict[str, str],
+        on_output: Optional[OutputCallback],
+    ) -> str:
+        """세션 기록으로 이 워커의 클라이언트에서 채팅을 만들어 메시지를 보내고 기록을 갱신"""
+        session = self._chat_session(args["session_id"])
+        async with session.lock:
+            chat = worker.client.aio.chats.create(
+                model=SDK_DEFAULT_MODEL, history=session.history
+            )
+            if on_output is None:
+                text = (await chat.send_message(args["message"])).text or ""
+            else:
+                stream = await chat.send_message_stream(args["message"])
+                text = await self._collect(stream, on_output)
+            session.history = chat.get_history()
+        return text
+
+    async def _work(self, worker: SDKWorker) -> None:
+        while True:
+            await worker.ready.wait()
+            job = await self.queue.get()
+            if job.future.done():
+                # 대기 중에 시간 초과/취소된 요청
+                continue
+            try:
+                # 작업 생성 중의 동기 예외도 아래에서 처리해 워커 루프가 죽지 않게 한다
+                call = asyncio.create_task(
+                    self._call(worker, job.kind, job.args, job.on_output)
+                )
+                job.future.add_done_callback(lambda _, call=call: call.cancel())
+                text = await call
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    raise
+                continue
+            except Exception as e:
+                if is_worker_failure(e):
+                    worker.failures += 1
+                    worker.consecutive_failures += 1
+                    if worker.consecutive_failures >= SDK_MAX_FAILURES:
+                        worker.ready.clear()
+                        self._degraded.set()
+                else:
+                    worker.errors += 1
+                if not job.future.done():
+                    job.future.set_result((1, "", str(e)))
+                continue
+            worker.calls += 1
+            worker.consecutive_failures = 0
+            if not job.future.done():
+                job.future.set_result((0, text, ""))
+
+    async def _check(self, worker: SDKWorker) -> None:
+        try:
+            await asyncio.wait_for(
+                worker.client.aio.models.get(model=SDK_DEFAULT_MODEL), 10
+            )
+            worker.consecutive_failures = 0
+            worker.ready.set()
+        except Exception as e:
+            print(f"워커 {worker.index} 헬스 체크 실패: {e}", file=sys.stderr)
+            worker.ready.clear()
+            self._degraded.set()
+            worker.client = self._new_client()
+
+    async def _health_loop(self) -> None:
+        while True:
+            try:
+                # 비정상 워커가 생기면 주기를 기다리지 않고 곧바로 복구를 시도
+                await asyncio.wait_for(self._degraded.wait(), self.health_interval)
+                await asyncio.sleep(SDK_RECOVERY_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.gather(*[self._check(worker) for worker in self.workers])
+            if all(worker.healthy for worker in self.workers):
+                self._degraded.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "chat_sessions": len(self.chats),
+            "workers": [
+                {
+                    "index": worker.index,
+                    "healthy": worker.healthy,
+                    "calls": worker.calls,
+                    "failures": worker.failures,
+                    "errors": worker.errors,
+                }
+                for worker in self.workers
+            ],
+        }
+
+
+class ToolBusyError(Exception):
+    """도구의 대기열이 가득 차 요청을 받을 수 없음"""
+
+
+def _percentiles(samples: deque) -> Dict[str, float]:
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+class ToolLimiter:
+    """
+    도구별 동시 실행 수 제한과 길이 제한이 있는 대기열
+
+    동시 실행 슬롯이 모두 찼고 대기열도 가득 차면 기다리지 않고 ToolBusyError로 거절한다.
+    대기 시간과 실행 시간을 최근 STATS_SAMPLES개까지 기록한다.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue_limit: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_limit = queue_limit
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.wait_times: deque = deque(maxlen=STATS_SAMPLES)
+        self.run_times: deque = deque(maxlen=STATS_SAMPLES)
+
+    @classmethod
+    def from_env(cls, name: str) -> "ToolLimiter":
+        concurrency, queue_limit = TOOL_LIMITS[name]
+        override = os.getenv(f"{name.upper()}_LIMIT")
+        if override:
+            concurrency_text, _, queue_text = override.partition(":")
+            concurrency = int(concurrency_text)
+            queue_limit = int(queue_text) if queue_text else queue_limit
+        return cls(name, concurrency, queue_limit)
+
+    @asynccontextmanager
+    async def slot(self, timeout: float) -> AsyncIterator[None]:
+        """실행 슬롯을 얻을 때까지 최대 timeout초 대기"""
+        if self.semaphore.locked() and self.waiting >= self.queue_limit:
+            self.rejected += 1
+            raise ToolBusyError(
+                f"{self.name} 대기열이 가득 찼습니다 "
+                f"(실행 중 {self.running}/{self.concurrency}, 대기 {self.waiting}/{self.queue_limit})"
+            )
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), timeout)
+        finally:
+            self.waiting -= 1
+        acquired = time.monotonic()
+        self.wait_times.append(acquired - started)
+        self.running += 1
+        try:
+            yield
+        except asyncio.CancelledError:
+            # 취소된 작업은 즉시 슬롯을 반납하고 실행 시간 통계에서 제외
+            self.cancelled += 1
+            raise
+        else:
+            self.completed += 1
+            self.run_times.append(time.monotonic() - acquired)
+        finally:
+            self.running -= 1
+            self.semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "queue_limit": self.queue_limit,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "wait": _percentiles(self.wait_times),
+            "run": _percentiles(self.run_times),
+        }
+
+
+tool_limiters = {name: ToolLimiter.from_env(name) for name in TOOL_LIMITS}
+
+
+worker_pool: Optional[GeminiWorkerPool] = None
+
+
+async def get_worker_pool() -> GeminiWorkerPool:
+    global worker_pool
+    if worker_pool is None:
+        worker_pool = GeminiWorkerPool()
+        await worker_pool.start()
+    return worker_pool
+
+
+async def run_gemini(
+    kind: str,
+    args: Dict[str, str],
+    timeout: float,
+    prepare: Optional[Callable[[], Awaitable[Dict[str, str]]]] = None,
+) -> tuple[int, str, str]:
+    """
+    설정된 백엔드(cli 또는 sdk)로 요청 실행
+
+    도구별 동시 실행 수 제한을 거치며, 대기열이 가득 차면 ToolBusyError가 발생한다.
+    timeout은 슬롯 대기와 실행을 합친 전체 시간이다.
+    prepare가 있으면 슬롯을 얻은 뒤 실행해 그 결과를 args 대신 사용한다
+    (이미지 축소처럼 메모리를 많이 쓰는 준비 작업도 동시 실행 수 제한을 받게 한다).
+    클라이언트가 progressToken을 보냈으면 출력이 나오는 대로 진행 알림으로 전달한다.
+    """
+    progress = ProgressForwarder.for_current_request()
+    deadline = time.monotonic() + timeout
+    async with tool_limiters[KIND_TOOLS[kind]].slot(timeout):
+        if prepare is not None:
+            args = await prepare()
+        remaining = max(0.0, deadline - time.monotonic())
+        if GEMINI_BACKEND == "sdk":
+            pool = await get_worker_pool()
+            result = await pool.submit(kind, args, remaining, on_output=progress)
+        else:
+            result = await run_cli(
+                cli_command(kind, args), remaining, on_output=progress
+            )
+    if progress is not None:
+        await progress.flush()
+    return result
+
+
+class ImagePreprocessor:
+    """
+    분석 전에 이미지를 최대 해상도로 줄이고 내용 해시로 디스크에 캐시
+
+    같은 이미지를 여러 프롬프트로 분석할 때 매번 큰 원본을 넘기지 않도록 하고,
+    (이미지 해시, 프롬프트)별 분석 결과도 메모한다.
+    파일 해시는 (경로, 크기, 수정 시각)이 같으면 다시 계산하지 않는다.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = IMAGE_CACHE_DIR,
+        max_size: int = IMAGE_MAX_SIZE,
+        memo_size: int = ANALYSIS_MEMO_SIZE,
+        hash_memo_size: int = IMAGE_HASH_MEMO_SIZE,
+    ):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.memo_size = memo_size
+        self.hash_memo_size = hash_memo_size
+        self._hashes: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+        self._results: OrderedDict[tuple[str, str], str] = OrderedDict()
+        # 여러 to_thread 작업이 메모와 카운터를 동시에 고치므로 잠금으로 보호
+        self._lock = threading.Lock()
+        self.resized = 0
+        self.reused = 0
+        self.memo_hits = 0
+
+    def content_hash(self, image_path: str) -> str:
+        """원본 파일 내용의 SHA-256 (블로킹, 1 MiB씩 읽으므로 메모리는 거의 쓰지 않는다)"""
+        stat = os.stat(image_path)
+        key = (os.path.abspath(image_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest = self._hashes.get(key)
+            if digest is not None:
+                self._hashes.move_to_end(key)
+                return digest
+        # 파일 읽기는 잠금 밖에서 (같은 파일을 동시에 해시하면 결과가 같으므로 무해)
+        sha = hashlib.sha256()
+        with open(image_path, "rb") as f:
+            while block := f.read(1 << 20):
+                sha.update(block)
+        digest = sha.hexdigest()
+        with self._lock:
+            self._hashes[key] = digest
+            self._hashes.move_to_end(key)
+            while len(self._hashes) > self.hash_memo_size:
+                self._hashes.popitem(last=False)
+        return digest
+
+    def prepare(
+        self, image_path: str, digest: Optional[str] = None
+    ) -> tuple[str, str]:
+        """
+        분석에 사용할 이미지 경로와 원본 내용 해시를 반환 (블로킹, 스레드에서 호출)
+
+        최대 해상도 이하인 이미지는 원본 경로를 그대로 사용한다.
+        digest는 content_hash로 미리 구한 해시 (없으면 여기서 계산).
+        """
+        if digest is None:
+            digest = self.content_hash(image_path)
+        # 방향 보정 전에 만든 사본과 섞이지 않도록 파일 이름에 "o"(oriented)를 붙인다
+        prefix = os.path.join(self.cache_dir, f"{digest}_{self.max_size}o")
+        for extension in (".jpg", ".png"):
+            if os.path.exists(prefix + extension):
+                with self._lock:
+                    self.reused += 1
+                return prefix + extension, digest
+
+        with Image.open(image_path) as image:
+            if max(image.size) <= self.max_size:
+                return image_path, digest
+            # 사진(JPEG)은 JPEG로, 나머지는 무손실 PNG로 저장
+            is_jpeg = image.format == "JPEG"
+            cached = prefix + (".jpg" if is_jpeg else ".png")
+            # 저장하면 EXIF가 빠지므로 Orientation 태그대로 픽셀을 먼저 회전
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((self.max_size, self.max_size), Image.Resampling.LANCZOS)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # 동시에 같은 이미지를 처리해도 깨진 파일이 보이지 않도록 임시 파일 후 교체
+            temp_path = f"{cached}.{os.getpid()}.{id(image)}.tmp"
+            if is_jpeg:
+                image.save(temp_path, format="JPEG", quality=90)
+            else:
+                image.save(temp_path, format="PNG")
+        os.replace(temp_path, cached)
+        with self._lock:
+            self.resized += 1
+        return cached, digest
+
+    def recall(self, digest: str, prompt: str) -> Optional[str]:
+        with self._lock:
+            result = self._results.get((digest, prompt))
+            if result is not None:
+                self._results.move_to_end((digest, prompt))
+                self.memo_hits += 1
+            return result
+
+    def remember(self, digest: str, prompt: str, result: str) -> None:
+        with self._lock:
+            self._results[(digest, prompt)] = result
+            self._results.move_to_end((digest, prompt))
+            while len(self._results) > self.memo_size:
+                self._results.popitem(last=False)
+
+
+image_preprocessor = ImagePreprocessor()
+
+
+class ResponseCache:
+    """
+    (query, model)별 gemini_query 응답을 보관하는 SQLite 디스크 캐시
+
+    항목은 TTL이 지나면 만료되고, 개수가 max_entries를 넘으면 가장 오래 사용되지 않은
+    항목부터 제거한다. 조회는 기본 키 검색 한 번이라 수십 마이크로초 안에 끝난다.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = RESPONSE_CACHE_TTL,
+        max_entries: int = RESPONSE_CACHE_SIZE,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+            "created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)"
+        )
+
+    @staticmethod
+    def make_key(query: str, model: str) -> str:
+        return hashlib.sha256(json.dumps([model, query]).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        row = self.db.execute(
+            "SELECT response, created FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        response, created = row
+        if now - created > self.ttl:
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.expired += 1
+            self.misses += 1
+            return None
+        self.db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return response
+
+    def put(self, key: str, response: str) -> None:
+        now = time.time()
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses (key, response, created, last_used) "
+            "VALUES (?, ?, ?, ?)",
+            (key, response, now, now),
+        )
+        (count,) = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            self.db.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+            self.evictions += count - self.max_entries
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        (entries,) = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_PATH) if RESPONSE_CACHE_PATH else None
+
+
+def server_stats() -> Dict[str, Any]:
+    """도구별 부하와 캐시 통계"""
+    return {
+        "backend": GEMINI_BACKEND,
+        "tools": {name: limiter.stats() for name, limiter in tool_limiters.items()},
+        "response_cache": response_cache.stats() if response_cache else None,
+        "image_cache": {
+            "resized": image_preprocessor.resized,
+            "reused": image_preprocessor.reused,
+            "memo_hits": image_preprocessor.memo_hits,
+        },
+        "worker_pool": worker_pool.stats() if worker_pool else None,
+    }
+
+
+# 진행 중인 도구 호출 작업 (클라이언트 연결이 끊기면 모두 취소)
+in_flight_calls: set[asyncio.Task] = set()
+
+
 @app.call_tool()
 async def call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
+    """
+    도구 호출 처리
+
+    notifications/cancelled를 받으면 SDK가 이 작업을 취소하고, 클라이언트 연결이 끊기면
+    watch_disconnect가 취소한다. 취소는 run_cli까지 전파되어 CLI 프로세스 트리를 종료한다.
+    """
+    task = cast(asyncio.Task, asyncio.current_task())
+    in_flight_calls.add(task)
+    try:
+        return await handle_tool(name, arguments)
+    finally:
+        in_flight_calls.discard(task)
+
+
+async def handle_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
     try:
         if name == "gemini_query":
             query = arguments["query"]
             model = arguments.get("model", "gemini-pro")
 
-            cmd = ["gemini", "query", "--model", model, query]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            # 캐시 우회(no_cache) 시에도 새 응답은 캐시에 저장
+            cache_key = ResponseCache.make_key(query, model)
+            if response_cache is not None and not arguments.get("no_cache", False):
+                cached = response_cache.get(cache_key)
+                if cached is not None:
+                    return cli_result(0, cached, "")
 
-            if result.returncode == 0:
-                return CallToolResult(
-                    content=[TextContent(type="text", text=result.stdout.strip())]
-                )
-            else:
-                return CallToolResult(
-                    content=[TextContent(type="text", text=f"오류: {result.stderr}")],
-                    isError=True,
-                )
+            args = {"query": query, "model": model}
+            returncode, stdout, stderr = await run_gemini("query", args, timeout=30)
+            if response_cache is not None and returncode == 0:
+                response_cache.put(cache_key, stdout)
+            return cli_result(returncode, stdout, stderr)
 
         elif name == "gemini_chat":
             message = arguments["message"]
             session_id = arguments.get("session_id", "default")
 
-            cmd = ["gemini", "chat", "--session", session_id, message]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-
-            if result.returncode == 0:
-                return CallToolResult(
-                    content=[TextContent(type="text", text=result.stdout.strip())]
-                )
-            else:
-                return CallToolResult(
-                    content=[TextContent(type="text", text=f"오류: {result.stderr}")],
-                    isError=True,
-                )
+            args = {"message": message, "session_id": session_id}
+            return cli_result(*await run_gemini("chat", args, timeout=30))
 
         elif name == "gemini_image_analysis":
             image_path = arguments["image_path"]
             prompt = arguments["prompt"]
-            print(f"image_path:{image_path}, prompt:{prompt}")
+            print(f"image_path:{image_path}, prompt:{prompt}", file=sys.stderr)
 
-            cmd = ["gemini", "analyze", "--image", image_path, prompt]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+            # 같은 이미지와 프롬프트는 이전 결과를 재사용
+            image_hash = await asyncio.to_thread(
+                image_preprocessor.content_hash, image_path
+            )
+            cached = image_preprocessor.recall(image_hash, prompt)
+            if cached is not None:
+                return cli_result(0, cached, "")
 
-            if result.returncode == 0:
-                return CallToolResult(
-                    content=[TextContent(type="text", text=result.stdout.strip())]
-                )
-            else:
-                return CallToolResult(
-                    content=[TextContent(type="text", text=f"오류: {result.stderr}")],
-                    isError=True,
+            # 큰 이미지는 줄인 사본을 사용 (디코딩과 축소는 슬롯을 얻은 뒤에만 실행)
+            async def downscale() -> Dict[str, str]:
+                path, _ = await asyncio.to_thread(
+                    image_preprocessor.prepare, image_path, image_hash
                 )
+                return {"image_path": path, "prompt": prompt}
+
+            args = {"image_path": image_path, "prompt": prompt}
+            returncode, stdout, stderr = await run_gemini(
+                "analyze", args, timeout=60, prepare=downscale
+            )
+            if returncode == 0:
+                image_preprocessor.remember(image_hash, prompt, stdout)
+            return cli_result(returncode, stdout, stderr)
+
+        elif name == "server_stats":
+            return CallToolResult(
+                content=[
+                    TextContent(
+                        type="text",
+                        text=json.dumps(server_stats(), ensure_ascii=False, indent=2),
+                    )
+                ]
+            )
 
         else:
             return CallToolResult(
@@ -135,7 +1003,12 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
                 isError=True,
             )
 
-    except subprocess.TimeoutExpired:
+    except ToolBusyError as e:
+        return CallToolResult(
+            content=[TextContent(type="text", text=f"서버가 바쁩니다: {e}")],
+            isError=True,
+        )
+    except asyncio.TimeoutError:
         return CallToolResult(
             content=[TextContent(type="text", text="요청 시간 초과")], isError=True
         )
@@ -146,9 +1019,37 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> CallToolResult:
         )
 
 
+async def watch_disconnect(read_stream: Any, forward: Any) -> None:
+    """클라이언트 메시지를 서버로 전달하고, 연결이 끊기면 진행 중인 호출을 취소"""
+    async with forward:
+        async for message in read_stream:
+            await forward.send(message)
+    if in_flight_calls:
+        print(
+            f"클라이언트 연결 종료: 진행 중인 호출 {len(in_flight_calls)}개 취소",
+            file=sys.stderr,
+        )
+    for task in list(in_flight_calls):
+        task.cancel()
+
+
 async def main():
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await app.run(read_stream, write_stream, app.create_initialization_options())
+    if GEMINI_BACKEND == "sdk":
+        # 첫 요청이 워커 준비를 기다리지 않도록 미리 시작
+        await get_worker_pool()
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            # SDK 서버는 입력이 끝나도 진행 중인 핸들러가 끝날 때까지 기다리므로
+            # 입력 스트림을 감시해 연결 종료 시 직접 취소한다
+            forward, incoming = anyio.create_memory_object_stream[Any](0)
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(watch_disconnect, read_stream, forward)
+                await app.run(
+                    incoming, write_stream, app.create_initialization_options()
+                )
+    finally:
+        if worker_pool is not None:
+            await worker_pool.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# 서버/클라이언트 모듈은 스크립트로 실행되므로 해당 디렉터리를 import 경로에 추가
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path[:0] = [os.path.join(SRC, "mcp"), os.path.join(SRC, "fastmcp")]
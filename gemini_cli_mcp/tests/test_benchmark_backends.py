@@ -0,0 +1,53 @@
+import asyncio
+
+import benchmark_backends
+import mcp_server2
+
+
+def test_noop_pool_dispatch_overhead(monkeypatch):
+    # 워커 클라이언트 생성에만 쓰이고 실제 호출은 없음
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+
+    async def scenario():
+        pool = benchmark_backends.NoopWorkerPool(size=2)
+        await pool.start()
+        try:
+            return await benchmark_backends.measure(
+                lambda: pool.submit("query", {"query": "q", "model": ""}, 5),
+                calls=20,
+                concurrency=2,
+            )
+        finally:
+            await pool.close()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["calls_per_s"] > 0
+    assert stats["p95_ms"] < 1000
+
+
+def test_worker_survives_error_while_starting_call():
+    class BrokenPool(mcp_server2.GeminiWorkerPool):
+        def _new_client(self):
+            return None
+
+        # on_output 인수를 받지 않는 예전 시그니처
+        async def _call(self, worker, kind, args):  # type: ignore[override]
+            return "unreachable"
+
+    async def scenario():
+        pool = BrokenPool(size=1, health_interval=3600)
+        await pool.start()
+        try:
+            args = {"query": "q", "model": ""}
+            first = await pool.submit("query", args, 5)
+            second = await pool.submit("query", args, 5)
+        finally:
+            await pool.close()
+        return first, second
+
+    # 두 번째 요청도 시간 초과 없이 오류 결과를 받으면 워커 루프가 살아 있는 것
+    first, second = asyncio.run(scenario())
+
+    assert first[0] == 1 and "positional argument" in first[2]
+    assert second == first
@@ -0,0 +1,68 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+import mcp_server2
+
+
+def test_resized_copy_is_rotated_by_exif_orientation(tmp_path):
+    source = tmp_path / "phone.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: 시계 방향 90도 회전해서 표시
+    Image.new("RGB", (3000, 1000), "red").save(source, exif=exif)
+    preprocessor = mcp_server2.ImagePreprocessor(
+        cache_dir=str(tmp_path / "cache"), max_size=300
+    )
+
+    path, _ = preprocessor.prepare(str(source))
+
+    with Image.open(path) as image:
+        assert image.size == (100, 300)
+    assert preprocessor.resized == 1
+
+
+def test_content_hash_memo_is_bounded(tmp_path):
+    preprocessor = mcp_server2.ImagePreprocessor(
+        cache_dir=str(tmp_path / "cache"), hash_memo_size=2
+    )
+    for index in range(3):
+        image_path = tmp_path / f"{index}.png"
+        Image.new("RGB", (10, 10), (index, 0, 0)).save(image_path)
+        preprocessor.prepare(str(image_path))
+
+    assert len(preprocessor._hashes) == 2
+    assert [key[0] for key in preprocessor._hashes] == [
+        str(tmp_path / "1.png"),
+        str(tmp_path / "2.png"),
+    ]
+
+
+def test_memos_stay_consistent_under_concurrent_threads(tmp_path):
+    preprocessor = mcp_server2.ImagePreprocessor(
+        cache_dir=str(tmp_path / "cache"), memo_size=1, hash_memo_size=1
+    )
+    paths = []
+    for index in range(16):
+        image_path = tmp_path / f"{index}.png"
+        Image.new("RGB", (4, 4), (index, 0, 0)).save(image_path)
+        paths.append(str(image_path))
+
+    def work(worker: int) -> None:
+        for step in range(300):
+            path = paths[(worker + step) % len(paths)]
+            digest = preprocessor.content_hash(path)
+            preprocessor.remember(digest, "prompt", "result")
+            preprocessor.recall(digest, "prompt")
+
+    # 스레드 전환을 자주 일으켜 메모 갱신 사이의 경쟁을 드러낸다
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(work, range(8)))
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert len(preprocessor._hashes) == 1
+    assert len(preprocessor._results) == 1
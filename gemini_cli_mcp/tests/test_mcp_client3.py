@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+import mcp_client3
+
+
+@pytest.mark.parametrize("strategy", mcp_client3.SHAPING_STRATEGIES)
+@pytest.mark.parametrize("text", ["x" * 2500, "abcd\n" * 500, "가" * 3000])
+def test_clip_text_stays_within_budget(strategy, text):
+    budget = 100
+    tokens = mcp_client3.estimate_tokens(text)
+    max_chars = len(text) * budget // tokens
+
+    clipped = mcp_client3._clip_text(text, budget, strategy)
+
+    assert len(clipped) <= max_chars
+    assert mcp_client3.CLIP_MARKER.strip() in clipped
+
+
+def test_clip_text_keeps_short_text():
+    assert mcp_client3._clip_text("짧은 결과", 100, "head_tail") == "짧은 결과"
+
+
+def test_missing_server_script_raises_instead_of_exiting(monkeypatch):
+    monkeypatch.delenv("MCP_SERVER_SCRIPT", raising=False)
+    with pytest.raises(RuntimeError):
+        asyncio.run(mcp_client3.get_gemini_client())
+
+
+@pytest.mark.parametrize("pool_size", ["1", "2"])
+def test_failed_connect_cleans_up_client(tmp_path, monkeypatch, pool_size):
+    script = tmp_path / "server.py"
+    script.write_text("import sys\nsys.exit(1)\n")
+    monkeypatch.setenv("MCP_SERVER_SCRIPT", str(script))
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setenv("PROJECT_ID", "test-project")
+    monkeypatch.setenv("MCP_POOL_SIZE", pool_size)
+    cleaned = []
+    cleanup = mcp_client3.GeminiMCPClient.cleanup
+
+    async def tracking_cleanup(self):
+        cleaned.append(self)
+        await cleanup(self)
+
+    monkeypatch.setattr(mcp_client3.GeminiMCPClient, "cleanup", tracking_cleanup)
+
+    async def connect():
+        async with asyncio.timeout(30):
+            return await mcp_client3.get_gemini_client()
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(connect())
+    assert len(cleaned) == 1
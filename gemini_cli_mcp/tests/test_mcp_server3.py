@@ -0,0 +1,85 @@
+import os
+
+import mcp_server3
+
+list_files = mcp_server3.list_files.fn
+
+
+def test_list_files_pages_through_directory(tmp_path):
+    for name in "abcde":
+        (tmp_path / name).write_text(name)
+
+    names = []
+    cursor = None
+    while True:
+        page = list_files(str(tmp_path), cursor=cursor, page_size=2)
+        assert "error" not in page
+        names += [item["name"] for item in page["result"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert sorted(names) == list("abcde")
+
+
+def test_list_files_skips_entries_deleted_during_scan(tmp_path):
+    for name in "abcde":
+        (tmp_path / name).write_text(name)
+
+    first = list_files(str(tmp_path), page_size=1)
+    seen = {item["name"] for item in first["result"]}
+    # 열려 있는 스캔이 이미 읽어 둔 항목을 삭제
+    removed = [name for name in "abcde" if name not in seen][1:3]
+    for name in removed:
+        os.remove(tmp_path / name)
+
+    rest = list_files(str(tmp_path), cursor=first["next_cursor"], page_size=10)
+
+    assert "error" not in rest
+    names = seen | {item["name"] for item in rest["result"]}
+    assert names == set("abcde") - set(removed)
+
+
+file_tree = mcp_server3.file_tree.fn
+
+
+def make_tree(root):
+    (root / "top.txt").write_text("12345")
+    (root / "a").mkdir()
+    (root / "a" / "one.txt").write_text("1")
+    (root / "a" / "b").mkdir()
+    (root / "a" / "b" / "two.txt").write_text("22")
+
+
+def test_file_tree_max_depth_zero_lists_root_only(tmp_path):
+    make_tree(tmp_path)
+
+    paths = {item["path"] for item in file_tree(str(tmp_path), max_depth=0)["result"]}
+    assert paths == {"a", "top.txt"}
+
+    paths = {item["path"] for item in file_tree(str(tmp_path), max_depth=1)["result"]}
+    assert paths == {"a", "a/b", "a/one.txt", "top.txt"}
+
+
+def test_file_tree_records_unreadable_subdirectory(tmp_path, monkeypatch):
+    make_tree(tmp_path)
+    index_dir = mcp_server3._index_dir
+    broken = str(tmp_path / "a" / "b")
+
+    def flaky_index(path, stats):
+        if path == broken:
+            raise PermissionError(13, "Permission denied", path)
+        return index_dir(path, stats)
+
+    monkeypatch.setattr(mcp_server3, "_index_dir", flaky_index)
+    tree = file_tree(str(tmp_path), max_depth=5)
+
+    assert "error" not in tree
+    assert [error["path"] for error in tree["errors"]] == ["a/b"]
+    assert tree["total_size"] == 6
+    assert {item["path"] for item in tree["result"]} == {
+        "a",
+        "a/b",
+        "a/one.txt",
+        "top.txt",
+    }
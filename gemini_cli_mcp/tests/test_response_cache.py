@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+import mcp_server2
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(mcp_server2.time, "time", clock.time)
+    return clock
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = mcp_server2.ResponseCache(str(tmp_path / "cache.db"), ttl=60)
+    cache.put("k", "answer")
+
+    clock.now += 59
+    assert cache.get("k") == "answer"
+    clock.now += 2
+    assert cache.get("k") is None
+
+    assert cache.stats()["expired"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = mcp_server2.ResponseCache(str(tmp_path / "cache.db"), max_entries=3)
+    for key in "abc":
+        clock.now += 1
+        cache.put(key, key.upper())
+    clock.now += 1
+    assert cache.get("a") == "A"
+
+    clock.now += 1
+    cache.put("d", "D")
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["A", "C", "D"]
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 3
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "nested" / "cache.db")
+    mcp_server2.ResponseCache(path).put("k", "answer")
+
+    assert mcp_server2.ResponseCache(path).get("k") == "answer"
+
+
+def test_no_cache_bypasses_lookup_but_refreshes_entry(tmp_path, monkeypatch):
+    cache = mcp_server2.ResponseCache(str(tmp_path / "cache.db"))
+    monkeypatch.setattr(mcp_server2, "response_cache", cache)
+    monkeypatch.setattr(mcp_server2, "GEMINI_BACKEND", "cli")
+    replies = iter([(0, "first", ""), (0, "second", ""), (1, "", "failed")])
+    calls = []
+
+    async def fake_run_cli(cmd, timeout, on_output=None):
+        calls.append(cmd)
+        return next(replies)
+
+    monkeypatch.setattr(mcp_server2, "run_cli", fake_run_cli)
+
+    def query(**extra):
+        arguments = {"query": "q", "model": "m", **extra}
+        result = asyncio.run(mcp_server2.handle_tool("gemini_query", arguments))
+        return result.content[0].text
+
+    assert query() == "first"
+    assert query() == "first"
+    assert len(calls) == 1
+
+    assert query(no_cache=True) == "second"
+    assert query() == "second"
+    # 실패한 응답은 캐시에 저장하지 않는다
+    query(no_cache=True)
+    assert query() == "second"
+    assert len(calls) == 3
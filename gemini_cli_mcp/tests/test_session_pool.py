@@ -0,0 +1,106 @@
+import asyncio
+import sys
+import textwrap
+
+import pytest
+from mcp import StdioServerParameters
+
+import mcp_client3
+
+SERVER = textwrap.dedent(
+    """
+    import os
+    from mcp.server.fastmcp import FastMCP
+
+    mcp = FastMCP("pool-test")
+
+    @mcp.tool()
+    def pid() -> str:
+        return str(os.getpid())
+
+    @mcp.tool()
+    def crash() -> str:
+        os._exit(1)
+
+    mcp.run()
+    """
+)
+
+
+@pytest.fixture
+def server_params(tmp_path):
+    script = tmp_path / "server.py"
+    script.write_text(SERVER)
+    return StdioServerParameters(command=sys.executable, args=[str(script)])
+
+
+async def wait_for(condition, timeout=10.0):
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.05)
+
+
+def test_dead_session_is_replaced(server_params):
+    async def scenario():
+        pool = mcp_client3.MCPSessionPool(server_params, size=2)
+        await pool.start()
+        try:
+            dead = pool._least_loaded()
+            pool._pins["user"] = dead
+            with pytest.raises(Exception):
+                await dead.session.call_tool("crash", {})
+            await wait_for(lambda: dead not in pool.sessions)
+            assert "user" not in pool._pins
+            await wait_for(lambda: len(pool.sessions) == 2)
+            assert pool.respawns == 1
+            results = await asyncio.gather(
+                *[pool.call_tool("pid", {}) for _ in range(4)]
+            )
+            assert all(not result.isError for result in results)
+        finally:
+            await pool.close()
+        assert pool.sessions == []
+
+    asyncio.run(scenario())
+
+
+def test_failed_start_stops_spawned_sessions(server_params):
+    class FailingPool(mcp_client3.MCPSessionPool):
+        spawned = 0
+
+        async def _spawn(self):
+            FailingPool.spawned += 1
+            if FailingPool.spawned == 2:
+                raise RuntimeError("spawn failed")
+            return await super()._spawn()
+
+    async def scenario():
+        pool = FailingPool(server_params, size=2)
+        with pytest.raises(RuntimeError):
+            await pool.start()
+        assert pool.sessions == []
+        assert pool.respawns == 0
+
+    asyncio.run(scenario())
+
+
+def test_server_exiting_at_startup_fails_connect(tmp_path, monkeypatch):
+    script = tmp_path / "dead.py"
+    script.write_text("import sys\nsys.exit(1)\n")
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+
+    async def scenario():
+        pool = mcp_client3.MCPSessionPool(
+            StdioServerParameters(command=sys.executable, args=[str(script)]),
+            size=2,
+        )
+        # 서버가 죽는 시점에 따라 연결 종료(McpError) 또는 쓰기 실패로 나타난다
+        with pytest.raises((mcp_client3.mcp.McpError, ConnectionError)):
+            await pool.start()
+        assert pool.sessions == []
+
+        client = mcp_client3.GeminiMCPClient(api_key="test-key", project_id="test")
+        assert not await client.connect_to_pool(str(script), size=2)
+        assert client.pool is None
+
+    asyncio.run(asyncio.wait_for(scenario(), 30))
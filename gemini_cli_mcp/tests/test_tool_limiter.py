@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+from PIL import Image
+
+import mcp_server2
+
+
+def test_rejects_when_slots_and_queue_are_full():
+    async def scenario():
+        limiter = mcp_server2.ToolLimiter("gemini_query", concurrency=1, queue_limit=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot(5):
+                await release.wait()
+
+        running = asyncio.create_task(hold())
+        waiting = asyncio.create_task(hold())
+        await asyncio.sleep(0.01)
+        with pytest.raises(mcp_server2.ToolBusyError):
+            async with limiter.slot(5):
+                pass
+        release.set()
+        await asyncio.gather(running, waiting)
+        return limiter.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert stats["running"] == 0 and stats["waiting"] == 0
+
+
+def test_cancelled_calls_release_slot_and_skip_run_times():
+    async def scenario():
+        limiter = mcp_server2.ToolLimiter("gemini_query", concurrency=1, queue_limit=4)
+
+        async def hold():
+            async with limiter.slot(5):
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(hold())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        async with limiter.slot(0.1):
+            pass
+        return limiter
+
+    limiter = asyncio.run(scenario())
+
+    assert limiter.cancelled == 1
+    assert limiter.completed == 1
+    assert len(limiter.run_times) == 1
+
+
+def test_slot_wait_counts_against_tool_timeout(monkeypatch):
+    limiter = mcp_server2.ToolLimiter("gemini_query", concurrency=1, queue_limit=4)
+    monkeypatch.setitem(mcp_server2.tool_limiters, "gemini_query", limiter)
+    monkeypatch.setattr(mcp_server2, "GEMINI_BACKEND", "cli")
+    timeouts = []
+
+    async def fake_run_cli(cmd, timeout, on_output=None):
+        timeouts.append(timeout)
+        return 0, "ok", ""
+
+    monkeypatch.setattr(mcp_server2, "run_cli", fake_run_cli)
+
+    async def scenario():
+        async def hold():
+            async with limiter.slot(5):
+                await asyncio.sleep(0.3)
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0.01)
+        args = {"query": "q", "model": "gemini-pro"}
+        result = await mcp_server2.run_gemini("query", args, timeout=1.0)
+        await holder
+        return result
+
+    assert asyncio.run(scenario()) == (0, "ok", "")
+    assert 0 < timeouts[0] <= 0.75
+
+
+def test_image_downscale_runs_inside_limiter_slot(tmp_path, monkeypatch):
+    limiter = mcp_server2.ToolLimiter(
+        "gemini_image_analysis", concurrency=1, queue_limit=4
+    )
+    monkeypatch.setitem(mcp_server2.tool_limiters, "gemini_image_analysis", limiter)
+    monkeypatch.setattr(mcp_server2, "GEMINI_BACKEND", "cli")
+    events = []
+
+    class TrackingPreprocessor(mcp_server2.ImagePreprocessor):
+        def prepare(self, image_path, digest=None):
+            events.append(("prepare", limiter.running))
+            return super().prepare(image_path, digest)
+
+    monkeypatch.setattr(
+        mcp_server2,
+        "image_preprocessor",
+        TrackingPreprocessor(cache_dir=str(tmp_path / "cache"), max_size=50),
+    )
+
+    async def fake_run_cli(cmd, timeout, on_output=None):
+        events.append(("run", limiter.running))
+        await asyncio.sleep(0.05)
+        return 0, "ok", ""
+
+    monkeypatch.setattr(mcp_server2, "run_cli", fake_run_cli)
+    paths = []
+    for index in range(3):
+        path = tmp_path / f"{index}.png"
+        Image.new("RGB", (200, 100), (index, 0, 0)).save(path)
+        paths.append(str(path))
+
+    async def scenario():
+        return await asyncio.gather(
+            *[
+                mcp_server2.handle_tool(
+                    "gemini_image_analysis", {"image_path": path, "prompt": "p"}
+                )
+                for path in paths
+            ]
+        )
+
+    results = asyncio.run(scenario())
+
+    assert all(not result.isError for result in results)
+    # 축소는 슬롯을 잡은 상태에서만, 한 번에 하나씩 실행된다
+    assert [kind for kind, _ in events] == ["prepare", "run"] * 3
+    assert all(running == 1 for _, running in events)
+    assert mcp_server2.image_preprocessor.resized == 3
@@ -0,0 +1,147 @@
+import asyncio
+
+import httpx
+import pytest
+from google.genai import errors as genai_errors
+
+import mcp_server2
+
+
+class ScriptedPool(mcp_server2.GeminiWorkerPool):
+    """모델 호출 대신 정해 둔 결과(문자열 또는 예외)를 차례로 돌려주는 워커 풀"""
+
+    def __init__(self, outcomes):
+        super().__init__(size=1, queue_size=8, health_interval=3600)
+        self.outcomes = list(outcomes)
+
+    def _new_client(self):
+        return None
+
+    async def _call(self, worker, kind, args, on_output=None):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+async def run_jobs(pool, count):
+    await pool.start()
+    try:
+        return [
+            await pool.submit("query", {"query": "q", "model": ""}, timeout=5)
+            for _ in range(count)
+        ]
+    finally:
+        await pool.close()
+
+
+def client_error():
+    return genai_errors.ClientError(400, {"error": {"message": "bad request"}})
+
+
+@pytest.mark.parametrize(
+    "error",
+    [client_error(), FileNotFoundError("missing.png"), ValueError("bad kind")],
+)
+def test_caller_errors_do_not_degrade_worker(error):
+    pool = ScriptedPool([error] * (mcp_server2.SDK_MAX_FAILURES + 2) + ["ok"])
+
+    results = asyncio.run(run_jobs(pool, mcp_server2.SDK_MAX_FAILURES + 3))
+
+    worker = pool.workers[0]
+    assert worker.healthy
+    assert worker.failures == 0
+    assert worker.errors == mcp_server2.SDK_MAX_FAILURES + 2
+    assert results[-1] == (0, "ok", "")
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        genai_errors.ServerError(503, {"error": {"message": "unavailable"}}),
+        httpx.ConnectError("connection refused"),
+        TimeoutError(),
+    ],
+)
+def test_upstream_failures_take_worker_out_of_service(error):
+    pool = ScriptedPool([error] * mcp_server2.SDK_MAX_FAILURES)
+
+    results = asyncio.run(run_jobs(pool, mcp_server2.SDK_MAX_FAILURES))
+
+    worker = pool.workers[0]
+    assert not worker.healthy
+    assert worker.failures == mcp_server2.SDK_MAX_FAILURES
+    assert all(returncode == 1 for returncode, _, _ in results)
+
+
+def test_success_resets_consecutive_failures():
+    server_error = genai_errors.ServerError(500, {"error": {"message": "internal"}})
+    outcomes = [server_error] * (mcp_server2.SDK_MAX_FAILURES - 1) + ["ok"]
+    pool = ScriptedPool(outcomes + [server_error])
+
+    asyncio.run(run_jobs(pool, len(outcomes) + 1))
+
+    worker = pool.workers[0]
+    assert worker.healthy
+    assert worker.consecutive_failures == 1
+
+
+class FakeChat:
+    def __init__(self, client, history):
+        self.client = client
+        self.history = list(history or [])
+
+    async def send_message(self, message):
+        self.history += [message, f"{self.client.name}:{len(self.history) // 2}"]
+        return type("Response", (), {"text": self.history[-1]})()
+
+    def get_history(self):
+        return self.history
+
+
+class FakeClient:
+    created = 0
+
+    def __init__(self):
+        FakeClient.created += 1
+        self.name = f"client{FakeClient.created}"
+        self.aio = self
+        self.chats = self
+
+    def create(self, model, history=None):
+        return FakeChat(self, history)
+
+
+class FakeClientPool(mcp_server2.GeminiWorkerPool):
+    def _new_client(self):
+        return FakeClient()
+
+
+def test_chat_history_is_shared_across_workers_and_bounded():
+    async def scenario():
+        pool = FakeClientPool(size=2, health_interval=3600, chat_sessions=2)
+        await pool.start()
+        try:
+            first, second = pool.workers
+            await pool._call(first, "chat", {"session_id": "s1", "message": "m1"})
+            reply = await pool._call(
+                second, "chat", {"session_id": "s1", "message": "m2"}
+            )
+            # 다른 워커가 이어받아도 이전 대화 기록을 사용
+            assert reply == f"{second.client.name}:1"
+            assert pool.chats["s1"].history == [
+                "m1",
+                f"{first.client.name}:0",
+                "m2",
+                reply,
+            ]
+
+            for session_id in ("s2", "s3"):
+                await pool._call(
+                    first, "chat", {"session_id": session_id, "message": "hi"}
+                )
+            assert list(pool.chats) == ["s2", "s3"]
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
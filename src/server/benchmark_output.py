@@ -0,0 +1,93 @@
+"""
+weather 도구의 산문 출력과 구조화(JSON) 출력의 토큰 수 비교
+
+fixtures/nws의 응답(기본은 합성 데이터)을 실제 서버와 같은 포맷 함수로 변환해 측정한다.
+tiktoken이 설치되어 있으면 cl100k_base 인코딩을, 없으면 근사치(ASCII 4자당 1토큰)를 사용한다.
+
+사용 예:
+    python benchmark_output.py
+"""
+
+import json
+from pathlib import Path
+from typing import Callable
+
+import wheather_mcp_server as weather
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "nws"
+
+
+def estimate_tokens(text: str) -> int:
+    """영어 기준 평균 4자당 1토큰, 비ASCII 문자는 글자당 1토큰으로 근사"""
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars)
+
+
+def token_counter() -> tuple[str, Callable[[str], int]]:
+    try:
+        import tiktoken
+
+        # 인코딩 파일을 처음 쓸 때 내려받으므로 오프라인이면 여기서 실패할 수 있다
+        encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return "estimate (chars/4)", estimate_tokens
+    return "tiktoken cl100k_base", lambda text: len(encoding.encode(text))
+
+
+def forecast_outputs() -> dict[str, str]:
+    data = json.loads((FIXTURE_DIR / "forecast.json").read_text(encoding="utf-8"))
+    periods = data["properties"]["periods"][: weather.FORECAST_PERIODS]
+
+    def as_json(fields: tuple[str, ...]) -> str:
+        return weather.to_compact_json(
+            {"periods": [weather.project_period(p, fields) for p in periods]}
+        )
+
+    return {
+        "text (default)": "\n---\n".join(weather.format_period(p) for p in periods),
+        "json, default fields": as_json(weather.FORECAST_DEFAULT_FIELDS),
+        "json, name+temperature+shortForecast": as_json(
+            ("name", "temperature", "shortForecast")
+        ),
+        "json, all fields": as_json(weather.FORECAST_FIELDS),
+    }
+
+
+def alerts_outputs() -> dict[str, str]:
+    stream = weather.FeaturePropertiesStream(weather.ALERT_FIELDS)
+    features = [
+        {"properties": properties}
+        for properties in stream.feed(
+            (FIXTURE_DIR / "alerts.json").read_text(encoding="utf-8")
+        )
+    ]
+
+    def as_json(fields: tuple[str, ...]) -> str:
+        alerts = [{key: f["properties"].get(key) for key in fields} for f in features]
+        return weather.to_compact_json({"total": len(features), "alerts": alerts})
+
+    return {
+        "text (default)": "\n---\n".join(weather.format_alert(f) for f in features),
+        "json, default fields": as_json(weather.ALERT_DEFAULT_FIELDS),
+        "json, event+severity": as_json(("event", "severity")),
+        "json, all fields": as_json(weather.ALERT_FIELDS),
+    }
+
+
+def main():
+    counter_name, count = token_counter()
+    print(f"token counter: {counter_name}")
+    for tool, outputs in (
+        ("get_forecast", forecast_outputs()),
+        ("get_alerts", alerts_outputs()),
+    ):
+        baseline = count(outputs["text (default)"])
+        print(f"\n{tool}")
+        print(f"{'output':<40}{'chars':>8}{'tokens':>8}{'vs text':>9}")
+        for name, text in outputs.items():
+            tokens = count(text)
+            print(f"{name:<40}{len(text):>8}{tokens:>8}{tokens / baseline:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+weather MCP 서버 부하 테스트
+
+실제 stdio MCP 세션으로 서버를 띄우고 get_forecast/get_alerts를 동시에 호출해
+처리량과 지연 시간 백분위수를 보고한다. 기본으로 로컬 NWS 대역 서버를 함께 띄운다.
+
+사용 예:
+    python load_test.py --calls 500 --concurrency 16 --latency-ms 80 --jitter-ms 40
+    python load_test.py --base-url http://127.0.0.1:8765   # 이미 실행 중인 대역 서버 사용
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from nws_standin import StandInConfig, start_standin
+
+SERVER_PATH = Path(__file__).parent / "wheather_mcp_server.py"
+STATES = ["KS", "MO", "NE", "OK", "CO", "IA", "TX", "CA", "NY", "FL"]
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def build_calls(args: argparse.Namespace) -> list[tuple[str, dict]]:
+    """도구 호출 목록을 만든다 (위치와 주는 고정 집합에서 골라 반복 호출이 생기게)"""
+    rng = random.Random(args.seed)
+    locations = [
+        (round(rng.uniform(30, 45), 4), round(rng.uniform(-120, -75), 4))
+        for _ in range(args.locations)
+    ]
+    weights = {}
+    for part in args.mix.split(","):
+        tool, _, weight = part.partition("=")
+        weights[tool.strip()] = float(weight or 1)
+    calls = []
+    for _ in range(args.calls):
+        tool = rng.choices(list(weights), list(weights.values()))[0]
+        if tool == "forecast":
+            latitude, longitude = rng.choice(locations)
+            calls.append(("get_forecast", {"latitude": latitude, "longitude": longitude}))
+        else:
+            calls.append(("get_alerts", {"state": rng.choice(STATES)}))
+    return calls
+
+
+async def drive(session: ClientSession, calls: list, concurrency: int) -> dict:
+    latencies: dict[str, list[float]] = {}
+    failures: dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(tool: str, arguments: dict) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            result = await session.call_tool(tool, arguments)
+            elapsed = (time.perf_counter() - started) * 1000
+        latencies.setdefault(tool, []).append(elapsed)
+        text = result.content[0].text if result.content else ""
+        if result.isError or text.startswith("Unable"):
+            failures[tool] = failures.get(tool, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(tool, arguments) for tool, arguments in calls))
+    return {
+        "elapsed": time.perf_counter() - started,
+        "latencies": latencies,
+        "failures": failures,
+    }
+
+
+async def run(args: argparse.Namespace) -> None:
+    standin = None
+    base_url = args.base_url
+    if base_url is None:
+        standin = start_standin(
+            StandInConfig(
+                args.latency_ms,
+                args.jitter_ms,
+                args.error_rate,
+                args.slow_rate,
+                args.slow_ms,
+            )
+        )
+        base_url = standin.base_url
+
+    work_dir = Path(tempfile.mkdtemp(prefix="weather-load-"))
+    env = {
+        **os.environ,
+        "NWS_API_BASE": base_url,
+        "NWS_GRID_CACHE": str(work_dir / "grid_cache.json"),
+        "NWS_LOG_LEVEL": "WARNING",
+    }
+    if args.no_http_cache:
+        env["NWS_HTTP_CACHE_BYTES"] = "0"
+    params = StdioServerParameters(
+        command=sys.executable, args=[str(SERVER_PATH)], env=env
+    )
+    calls = build_calls(args)
+
+    # 서버 로그가 결과 출력과 섞이지 않도록 파일로 보낸다
+    with open(work_dir / "server.log", "w") as errlog:
+        async with stdio_client(params, errlog=errlog) as (read_stream, write_stream):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                result = await drive(session, calls, args.concurrency)
+                stats = await session.call_tool("server_stats", {})
+
+    all_latencies = [ms for samples in result["latencies"].values() for ms in samples]
+    print(f"upstream: {base_url}  (server log: {work_dir / 'server.log'})")
+    print(
+        f"calls: {len(calls)}  concurrency: {args.concurrency}  "
+        f"throughput: {len(calls) / result['elapsed']:.1f} calls/s"
+    )
+    print(f"{'tool':<14}{'calls':>7}{'fail':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    rows = {**result["latencies"], "all": all_latencies}
+    for tool, samples in rows.items():
+        failures = (
+            sum(result["failures"].values())
+            if tool == "all"
+            else result["failures"].get(tool, 0)
+        )
+        print(
+            f"{tool:<14}{len(samples):>7}{failures:>6}"
+            f"{percentile(samples, 0.5):>9.1f}{percentile(samples, 0.95):>9.1f}"
+            f"{percentile(samples, 0.99):>9.1f}{max(samples):>9.1f}"
+        )
+    if args.verbose:
+        print(json.dumps(json.loads(stats.content[0].text), indent=2))
+    if standin is not None:
+        state = standin.state
+        print(
+            f"stand-in: {state.requests} requests, {state.not_modified} not modified, "
+            f"{state.errors} injected errors"
+        )
+        standin.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--locations", type=int, default=20)
+    parser.add_argument("--mix", default="forecast=3,alerts=1")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--base-url", help="대역 서버를 띄우지 않고 이 NWS 주소 사용")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-ms", type=float, default=1000.0)
+    parser.add_argument("--no-http-cache", action="store_true")
+    parser.add_argument("-v", "--verbose", action="store_true", help="server_stats 출력")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
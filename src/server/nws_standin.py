@@ -0,0 +1,217 @@
+"""
+오프라인 벤치마크와 회귀 테스트를 위한 NWS API 대역 서버
+
+fixtures/nws 아래의 /points, /forecast, /alerts 응답을 돌려준다. 기본 fixture는 실제 NWS
+응답 형식을 본떠 손으로 만든 합성 데이터이며(경보 ID 등은 가짜), --record로 실제 응답으로
+바꿀 수 있다. 지연 시간, 오류 비율, 캐시 헤더를 조절할 수 있다.
+
+사용 예:
+    python nws_standin.py --port 8765 --latency-ms 80 --jitter-ms 40 --error-rate 0.02
+    python nws_standin.py --slow-rate 0.02 --slow-ms 3000   # 느린 응답 꼬리 재현
+    NWS_API_BASE=http://127.0.0.1:8765 python wheather_mcp_server.py
+
+    # 실제 API에서 fixture 다시 기록
+    python nws_standin.py --record --lat 39.7456 --lon -97.0892 --state KS
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "nws"
+RECORDED_BASE = "https://api.weather.gov"
+
+POINTS_PATH = re.compile(r"^/points/(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?)$")
+FORECAST_PATH = re.compile(r"^/gridpoints/(\w+)/(\d+),(\d+)/forecast$")
+ALERTS_PATH = re.compile(r"^/alerts/active/area/(\w+)$")
+
+
+@dataclass
+class StandInConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    # 일부 요청만 slow_ms만큼 더 늦게 응답 (느린 엣지 노드 흉내, 꼬리 지연 실험용)
+    slow_rate: float = 0.0
+    slow_ms: float = 1000.0
+    # 엔드포인트별 Cache-Control max-age (초, NWS 실제 값과 비슷하게)
+    points_max_age: int = 86400
+    forecast_max_age: int = 900
+    alerts_max_age: int = 30
+
+
+class StandInState:
+    """fixture와 요청 통계 (여러 핸들러 스레드가 공유)"""
+
+    def __init__(self, config: StandInConfig, base_url: str):
+        self.config = config
+        self.base_url = base_url
+        self.fixtures = {
+            name: (FIXTURE_DIR / f"{name}.json")
+            .read_text(encoding="utf-8")
+            .replace(RECORDED_BASE, base_url)
+            for name in ("points", "forecast", "alerts")
+        }
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.not_modified = 0
+
+    def count(self, field: str) -> None:
+        with self.lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def points(self, latitude: float, longitude: float) -> str:
+        # 좌표마다 다른 그리드를 돌려줘 예보 URL 캐시가 실제처럼 동작하게 한다
+        grid_x = int(abs(longitude) * 100) % 200
+        grid_y = int(abs(latitude) * 100) % 200
+        return self.fixtures["points"].replace("TOP/32,81", f"TOP/{grid_x},{grid_y}")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 헤더와 본문을 따로 쓰므로 Nagle 알고리즘이 켜져 있으면 응답마다 수십 ms 지연된다
+    disable_nagle_algorithm = True
+    server: "StandInServer"
+
+    def do_GET(self) -> None:
+        state = self.server.state
+        config = state.config
+        state.count("requests")
+        delay = config.latency_ms + random.uniform(0, config.jitter_ms)
+        if random.random() < config.slow_rate:
+            delay += config.slow_ms
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if random.random() < config.error_rate:
+            state.count("errors")
+            self._send(503, '{"title": "Service Unavailable"}', max_age=0)
+            return
+
+        path = self.path.split("?", 1)[0]
+        if match := POINTS_PATH.match(path):
+            body = state.points(float(match[1]), float(match[2]))
+            self._send(200, body, config.points_max_age)
+        elif FORECAST_PATH.match(path):
+            self._send(200, state.fixtures["forecast"], config.forecast_max_age)
+        elif ALERTS_PATH.match(path):
+            self._send(200, state.fixtures["alerts"], config.alerts_max_age)
+        elif path == "/_stats":
+            stats = {
+                "requests": state.requests,
+                "errors": state.errors,
+                "not_modified": state.not_modified,
+            }
+            self._send(200, json.dumps(stats), max_age=0)
+        else:
+            self._send(404, '{"title": "Not Found"}', max_age=0)
+
+    def _send(self, status: int, body: str, max_age: int) -> None:
+        payload = body.encode("utf-8")
+        etag = f'"{hashlib.sha1(payload).hexdigest()[:16]}"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.server.state.count("not_modified")
+            status, payload = 304, b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/geo+json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Cache-Control", f"public, max-age={max_age}")
+        if status in (200, 304):
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str, port: int, config: StandInConfig):
+        super().__init__((host, port), StandInHandler)
+        self.state = StandInState(config, f"http://{host}:{self.server_port}")
+
+    def handle_error(self, request, client_address) -> None:
+        # 헤지 요청에서 진 쪽처럼 클라이언트가 먼저 끊은 연결은 정상 상황
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def base_url(self) -> str:
+        return self.state.base_url
+
+
+def start_standin(
+    config: StandInConfig, host: str = "127.0.0.1", port: int = 0
+) -> StandInServer:
+    """백그라운드 스레드에서 대역 서버를 시작 (port=0이면 빈 포트 사용)"""
+    server = StandInServer(host, port, config)
+    threading.Thread(target=server.serve_forever, name="nws-standin", daemon=True).start()
+    return server
+
+
+def record_fixtures(latitude: float, longitude: float, state: str) -> None:
+    """실제 NWS API 응답을 fixture 파일로 저장"""
+    import httpx
+
+    headers = {"User-Agent": "weather-app/1.0", "Accept": "application/geo+json"}
+    with httpx.Client(headers=headers, timeout=30.0, follow_redirects=True) as client:
+        points = client.get(f"{RECORDED_BASE}/points/{latitude},{longitude}")
+        points.raise_for_status()
+        forecast = client.get(points.json()["properties"]["forecast"])
+        forecast.raise_for_status()
+        alerts = client.get(f"{RECORDED_BASE}/alerts/active/area/{state}")
+        alerts.raise_for_status()
+    for name, response in (("points", points), ("forecast", forecast), ("alerts", alerts)):
+        text = json.dumps(response.json(), indent=4, ensure_ascii=False)
+        (FIXTURE_DIR / f"{name}.json").write_text(text + "\n", encoding="utf-8")
+        print(f"recorded {name}.json ({len(text)} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-ms", type=float, default=1000.0)
+    parser.add_argument("--max-age", type=int, help="모든 엔드포인트의 max-age를 덮어씀")
+    parser.add_argument("--record", action="store_true", help="실제 API에서 fixture 기록")
+    parser.add_argument("--lat", type=float, default=39.7456)
+    parser.add_argument("--lon", type=float, default=-97.0892)
+    parser.add_argument("--state", default="KS")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.lat, args.lon, args.state)
+        return
+
+    config = StandInConfig(
+        args.latency_ms, args.jitter_ms, args.error_rate, args.slow_rate, args.slow_ms
+    )
+    if args.max_age is not None:
+        config.points_max_age = config.forecast_max_age = config.alerts_max_age = (
+            args.max_age
+        )
+    server = StandInServer(args.host, args.port, config)
+    print(f"NWS stand-in listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,268 @@
-from typing import Any
+from collections import Counter, OrderedDict, deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Literal
+from urllib.parse import urlsplit
+import asyncio
+import heapq
 import httpx
 from mcp.server.fastmcp import FastMCP
+import json
 import logging
+import math
+import os
+import re
 import sys
-
-# Initialize FastMCP server
-mcp = FastMCP("weather")
+import time
 
 # Constants
-NWS_API_BASE = "https://api.weather.gov"
+# NWS_API_BASE로 로컬 대역 서버(nws_standin.py)를 가리키면 오프라인으로 실행 가능
+NWS_API_BASE = os.getenv("NWS_API_BASE", "https://api.weather.gov").rstrip("/")
 USER_AGENT = "weather-app/1.0"
 
+# 공유 HTTP 클라이언트 설정 (HTTP/2는 h2 패키지가 설치된 경우에만 사용, httpx[http2]로 설치됨)
+NWS_HTTP2 = os.getenv("NWS_HTTP2", "1") != "0" and find_spec("h2") is not None
+NWS_MAX_CONNECTIONS = int(os.getenv("NWS_MAX_CONNECTIONS", "20"))
+NWS_MAX_KEEPALIVE = int(os.getenv("NWS_MAX_KEEPALIVE", "10"))
+NWS_KEEPALIVE_EXPIRY = float(os.getenv("NWS_KEEPALIVE_EXPIRY", "60"))
+NWS_CONNECT_TIMEOUT = float(os.getenv("NWS_CONNECT_TIMEOUT", "5"))
+NWS_READ_TIMEOUT = float(os.getenv("NWS_READ_TIMEOUT", "30"))
+
+# HTTP 응답 캐시 최대 크기 (본문 바이트 기준, 0이면 사용 안 함)
+HTTP_CACHE_MAX_BYTES = int(os.getenv("NWS_HTTP_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+# 만료된 응답을 즉시 돌려주고 백그라운드에서 갱신할 수 있는 기간(초)
+# (응답에 stale-while-revalidate 지시자가 있으면 그 값을 사용)
+STALE_WHILE_REVALIDATE = float(os.getenv("NWS_STALE_WHILE_REVALIDATE", "120"))
+# 경보(/alerts)는 늦게 전달되면 안 되므로 기본으로 만료된 응답을 제공하지 않는다
+# (응답의 stale-while-revalidate 지시자도 이 값을 넘지 않는다)
+ALERTS_STALE_WHILE_REVALIDATE = float(
+    os.getenv("NWS_ALERTS_STALE_WHILE_REVALIDATE", "0")
+)
+# 자주 조회되는 URL(지점 예보, 주별 경보)을 만료 전에 미리 갱신하는 설정
+# 접근 점수는 HOT_HALF_LIFE초마다 절반으로 줄고, HOT_MIN_SCORE 이상이면 인기 항목
+HOT_HALF_LIFE = float(os.getenv("NWS_HOT_HALF_LIFE", "600"))
+HOT_MIN_SCORE = float(os.getenv("NWS_HOT_MIN_SCORE", "3"))
+REFRESH_INTERVAL = float(os.getenv("NWS_REFRESH_INTERVAL", "5"))
+REFRESH_AHEAD = float(os.getenv("NWS_REFRESH_AHEAD", "30"))
+REFRESH_MAX_PER_SWEEP = int(os.getenv("NWS_REFRESH_MAX", "20"))
+
+# 지연 시간 기반 적응형 타임아웃: 최근 LATENCY_WINDOW개 응답의 p99 × TIMEOUT_MULTIPLIER
+# (표본이 LATENCY_MIN_SAMPLES개 미만이면 NWS_READ_TIMEOUT 사용)
+LATENCY_WINDOW = int(os.getenv("NWS_LATENCY_WINDOW", "200"))
+LATENCY_MIN_SAMPLES = int(os.getenv("NWS_LATENCY_MIN_SAMPLES", "20"))
+TIMEOUT_MULTIPLIER = float(os.getenv("NWS_TIMEOUT_MULTIPLIER", "3"))
+MIN_TIMEOUT = float(os.getenv("NWS_MIN_TIMEOUT", "2"))
+# 응답이 p95보다 늦으면 같은 요청을 한 번 더 보낸다 (전체 요청의 HEDGE_MAX_RATIO 이내)
+HEDGE_ENABLED = os.getenv("NWS_HEDGE", "1") != "0"
+HEDGE_PERCENTILE = float(os.getenv("NWS_HEDGE_PERCENTILE", "0.95"))
+HEDGE_MIN_DELAY = float(os.getenv("NWS_HEDGE_MIN_DELAY", "0.05"))
+HEDGE_MAX_RATIO = float(os.getenv("NWS_HEDGE_MAX_RATIO", "0.1"))
+# 연속 BREAKER_THRESHOLD번 실패하면 BREAKER_COOLDOWN초 동안 요청을 보내지 않는다
+BREAKER_THRESHOLD = int(os.getenv("NWS_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.getenv("NWS_BREAKER_COOLDOWN", "30"))
+
+# 좌표 → 예보 그리드 캐시 설정 (좌표를 GRID_ROUNDING 자리로 반올림해 키로 사용)
+GRID_CACHE_PATH = Path(
+    os.getenv(
+        "NWS_GRID_CACHE", Path.home() / ".cache" / "weather-mcp" / "grid_cache.json"
+    )
+)
+GRID_ROUNDING = int(os.getenv("NWS_GRID_ROUNDING", "4"))
+GRID_PREWARM_FILE = os.getenv("NWS_GRID_PREWARM", "")
+GRID_PREWARM_CONCURRENCY = int(os.getenv("NWS_GRID_PREWARM_CONCURRENCY", "4"))
+
+# 여러 지점 예보 일괄 조회 시 동시 조회 수와 한 번에 받을 수 있는 지점 수
+FORECAST_BATCH_CONCURRENCY = int(os.getenv("NWS_FORECAST_CONCURRENCY", "8"))
+FORECAST_BATCH_MAX = int(os.getenv("NWS_FORECAST_BATCH_MAX", "50"))
+ALERTS_BATCH_MAX = int(os.getenv("NWS_ALERTS_BATCH_MAX", "60"))
+
+# 경보 GeoJSON에서 스트리밍으로 추출해 캐시에 보관할 properties 필드 (geometry 등은 버림)
+ALERT_FIELDS = (
+    "event",
+    "headline",
+    "areaDesc",
+    "severity",
+    "urgency",
+    "certainty",
+    "effective",
+    "expires",
+    "description",
+    "instruction",
+)
+
+# format="json"일 때 사용할 수 있는 필드와, fields를 지정하지 않았을 때의 기본 필드
+FORECAST_FIELDS = (
+    "name",
+    "startTime",
+    "endTime",
+    "isDaytime",
+    "temperature",
+    "temperatureUnit",
+    "precipitationChance",
+    "windSpeed",
+    "windDirection",
+    "shortForecast",
+    "detailedForecast",
+)
+FORECAST_DEFAULT_FIELDS = (
+    "name",
+    "temperature",
+    "temperatureUnit",
+    "windSpeed",
+    "windDirection",
+    "shortForecast",
+)
+ALERT_DEFAULT_FIELDS = ("event", "severity", "urgency", "areaDesc", "headline", "expires")
+FORECAST_PERIODS = 5
+
+# 구조화 출력(JSON) 형식 정의 (schema://weather/{name} 리소스로 제공)
+OUTPUT_SCHEMAS: dict[str, dict[str, Any]] = {
+    "forecast": {
+        "type": "object",
+        "properties": {
+            "periods": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "startTime": {"type": "string", "format": "date-time"},
+                        "endTime": {"type": "string", "format": "date-time"},
+                        "isDaytime": {"type": "boolean"},
+                        "temperature": {"type": "number"},
+                        "temperatureUnit": {"type": "string"},
+                        "precipitationChance": {"type": ["number", "null"]},
+                        "windSpeed": {"type": "string"},
+                        "windDirection": {"type": "string"},
+                        "shortForecast": {"type": "string"},
+                        "detailedForecast": {"type": "string"},
+                    },
+                },
+            },
+            "error": {"type": "string"},
+        },
+    },
+    "alerts": {
+        "type": "object",
+        "properties": {
+            "total": {"type": "integer", "description": "Active alerts before filtering"},
+            "alerts": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        field: {"type": ["string", "null"]} for field in ALERT_FIELDS
+                    },
+                },
+            },
+            "error": {"type": "string"},
+        },
+    },
+}
+
+
+class ConnectionStats:
+    """httpcore trace 이벤트로 연결 재사용 여부를 집계"""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.http_versions: Counter[str] = Counter()
+
+    def trace(self) -> Any:
+        """요청 하나에 붙일 trace 콜백 (새 TCP 연결이 없으면 재사용된 연결)"""
+        self.requests += 1
+
+        async def on_event(event: str, info: dict) -> None:
+            if event == "connection.connect_tcp.complete":
+                self.new_connections += 1
+            elif event == "connection.start_tls.complete":
+                self.tls_handshakes += 1
+
+        return on_event
+
+    def record_response(self, response: httpx.Response) -> None:
+        self.http_versions[response.http_version] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        reused = max(0, self.requests - self.new_connections)
+        return {
+            "http2_enabled": NWS_HTTP2,
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0,
+            "tls_handshakes": self.tls_handshakes,
+            "http_versions": dict(self.http_versions),
+        }
+
+
+connection_stats = ConnectionStats()
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """프로세스 전체에서 공유하는 NWS용 HTTP 클라이언트 (연결 유지, 연결 풀 사용)"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=NWS_HTTP2,
+            headers={"User-Agent": USER_AGENT, "Accept": "application/geo+json"},
+            limits=httpx.Limits(
+                max_connections=NWS_MAX_CONNECTIONS,
+                max_keepalive_connections=NWS_MAX_KEEPALIVE,
+                keepalive_expiry=NWS_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                NWS_READ_TIMEOUT, connect=NWS_CONNECT_TIMEOUT, pool=NWS_CONNECT_TIMEOUT
+            ),
+            follow_redirects=True,
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """서버 시작 시 HTTP 클라이언트를 만들고 종료 시 연결을 닫는다"""
+    get_http_client()
+    refresh_task = asyncio.create_task(refresh_hot_entries())
+    prewarm_task = None
+    if GRID_PREWARM_FILE:
+        # 시작을 막지 않도록 그리드 미리 채우기는 백그라운드에서 실행
+        # (최적화일 뿐이므로 파일을 읽지 못해도 서버는 그대로 시작)
+        try:
+            locations = load_prewarm_locations(Path(GRID_PREWARM_FILE))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping grid prewarm from {GRID_PREWARM_FILE}: {e}")
+        else:
+            prewarm_task = asyncio.create_task(prewarm_grid(locations))
+    try:
+        yield
+    finally:
+        refresh_task.cancel()
+        for task in [prewarm_task, *background_refreshes]:
+            if task is not None:
+                task.cancel()
+        logger.info(f"Closing NWS client: {connection_stats.snapshot()}")
+        await close_http_client()
+
+
+# Initialize FastMCP server
+mcp = FastMCP("weather", lifespan=lifespan)
+
 
 @mcp.resource("knowledge://profile/{username}")
 def get_user_profile(username: str) -> dict:
@@ -22,27 +274,818 @@ def get_user_profile(username: str) -> dict:
     return profiles.get(username, {"error": "User not found"})
 
 
-# 로깅 설정
+@mcp.resource("schema://weather/{name}")
+def get_output_schema(name: str) -> dict:
+    """format="json"으로 받는 get_forecast(forecast), get_alerts(alerts) 응답의 JSON Schema"""
+    if name not in OUTPUT_SCHEMAS:
+        raise ValueError(f"Unknown schema: {name} (available: {', '.join(OUTPUT_SCHEMAS)})")
+    return OUTPUT_SCHEMAS[name]
+
+
+# 로깅 설정 (stdout은 stdio 전송의 JSON-RPC 채널이므로 stderr로 출력)
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=os.getenv("NWS_LOG_LEVEL", "DEBUG").upper(),
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)],
+    handlers=[logging.StreamHandler(sys.stderr)],
 )
 
 logger = logging.getLogger("mcp-server")
 
 
-async def make_nws_request(url: str) -> dict[str, Any] | None:
-    """Make a request to the NWS API with proper error handling."""
-    headers = {"User-Agent": USER_AGENT, "Accept": "application/geo+json"}
+def _http_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def cache_directives(headers: httpx.Headers) -> dict[str, str]:
+    directives = {}
+    for part in headers.get("Cache-Control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+
+def _age_seconds(headers: httpx.Headers) -> float:
+    """Age 헤더(초), 형식이 잘못됐으면 0으로 본다"""
+    try:
+        age = float(headers.get("Age") or 0)
+    except ValueError:
+        return 0.0
+    return age if math.isfinite(age) and age > 0 else 0.0
+
+
+def freshness_lifetime(headers: httpx.Headers) -> float | None:
+    """
+    Cache-Control/Expires로 응답의 남은 유효 시간(초)을 계산
+
+    Returns:
+        저장하면 안 되는 응답(no-store)은 None, 매번 재검증해야 하면 0
+    """
+    directives = cache_directives(headers)
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    age = _age_seconds(headers)
+    if "max-age" in directives:
+        try:
+            return max(0.0, float(directives["max-age"]) - age)
+        except ValueError:
+            return 0.0
+    expires = _http_date(headers.get("Expires"))
+    if expires is not None:
+        date = _http_date(headers.get("Date")) or time.time()
+        return max(0.0, expires - date)
+    return 0.0
+
+
+def stale_window(url: str, headers: httpx.Headers, lifetime: float) -> float:
+    """만료 후에도 재검증하는 동안 그대로 제공할 수 있는 기간(초)"""
+    directives = cache_directives(headers)
+    # 매번 재검증해야 하는 응답은 만료된 채로 제공하지 않는다
+    if lifetime <= 0 or "must-revalidate" in directives:
+        return 0.0
+    try:
+        window = float(directives["stale-while-revalidate"])
+    except (KeyError, ValueError):
+        window = STALE_WHILE_REVALIDATE
+    if "/alerts/" in urlsplit(url).path:
+        window = min(window, ALERTS_STALE_WHILE_REVALIDATE)
+    return window
+
+
+# 응답 본문을 읽어 (캐시에 저장할 데이터, 바이트 수)를 반환하는 함수
+ResponseParser = Callable[[httpx.Response], Awaitable[tuple[dict[str, Any], int]]]
+
+
+async def read_json(response: httpx.Response) -> tuple[dict[str, Any], int]:
+    body = await response.aread()
+    return json.loads(body), len(body)
+
+
+@dataclass
+class CachedResponse:
+    data: dict[str, Any]
+    size: int
+    expires_at: float
+    etag: str | None
+    last_modified: str | None
+    lifetime: float = 0.0
+    stale_for: float = 0.0
+    # 백그라운드 갱신 때도 같은 방식으로 본문을 읽도록 보관
+    parse: ResponseParser = read_json
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def is_usable_stale(self) -> bool:
+        return time.monotonic() < self.expires_at + self.stale_for
+
+    def validators(self) -> dict[str, str]:
+        """만료된 항목을 조건부 요청으로 재검증할 때 보낼 헤더"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HTTPCache:
+    """URL별 NWS 응답을 HTTP 캐시 규칙에 따라 보관하는 LRU (본문 바이트 수로 크기 제한)"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_served = 0
+        self.background_refreshes = 0
+
+    def get(self, url: str) -> CachedResponse | None:
+        entry = self.entries.get(url)
+        if entry is not None:
+            self.entries.move_to_end(url)
+        return entry
+
+    def store(
+        self,
+        url: str,
+        response: httpx.Response,
+        data: dict[str, Any],
+        size: int,
+        parse: ResponseParser,
+    ) -> None:
+        lifetime = freshness_lifetime(response.headers)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        self.discard(url)
+        # 저장 금지, 한도 초과, 또는 재사용도 재검증도 못 하는 응답은 보관하지 않는다
+        if (
+            lifetime is None
+            or size > self.max_bytes
+            or (lifetime == 0 and not etag and not last_modified)
+        ):
+            return
+        self.entries[url] = CachedResponse(
+            data,
+            size,
+            time.monotonic() + lifetime,
+            etag,
+            last_modified,
+            lifetime,
+            stale_window(url, response.headers, lifetime),
+            parse,
+        )
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= evicted.size
+            self.evictions += 1
+
+    def refresh(self, url: str, entry: CachedResponse, response: httpx.Response) -> None:
+        """304 응답의 헤더로 기존 항목의 유효 시간과 검증자를 갱신"""
+        lifetime = freshness_lifetime(response.headers)
+        if lifetime is None:
+            self.discard(url)
+            return
+        entry.expires_at = time.monotonic() + lifetime
+        entry.lifetime = lifetime
+        entry.stale_for = stale_window(url, response.headers, lifetime)
+        entry.etag = response.headers.get("ETag", entry.etag)
+        entry.last_modified = response.headers.get("Last-Modified", entry.last_modified)
+
+    def discard(self, url: str) -> None:
+        if (entry := self.entries.pop(url, None)) is not None:
+            self.bytes -= entry.size
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "stale_served": self.stale_served,
+            "background_refreshes": self.background_refreshes,
+        }
+
+
+http_cache = HTTPCache(HTTP_CACHE_MAX_BYTES)
+
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 요청이 하나의 업스트림 호출 결과를 함께 기다리게 한다"""
+
+    def __init__(self) -> None:
+        self.in_flight: dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        task = self.in_flight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.create_task(fetch())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # 기다리던 호출 하나가 취소되어도 공유 요청은 다른 호출을 위해 계속 진행
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": len(self.in_flight),
+            "upstream_requests": self.leaders,
+            "coalesced": self.coalesced,
+        }
+
+
+single_flight = SingleFlight()
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+class LatencyTracker:
+    """엔드포인트(points, gridpoints, alerts 등)별 최근 응답 시간으로 타임아웃과 헤지 지연을 정한다"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.samples: dict[str, deque[float]] = {}
+
+    @staticmethod
+    def endpoint(url: str) -> str:
+        return urlsplit(url).path.strip("/").split("/", 1)[0] or "/"
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        self.samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+
+    def record_timeout(self, endpoint: str, timeout: float) -> None:
+        """
+        시간 초과된 시도를 그 타임아웃 값의 표본으로 기록 (실제 지연은 이보다 길다)
+
+        완료된 시도만 기록하면 업스트림이 느려졌을 때 창에 예전의 빠른 표본만 남아
+        타임아웃이 다시 늘어나지 못한다.
+        """
+        self.record(endpoint, timeout)
+
+    def percentile(self, endpoint: str, q: float) -> float | None:
+        samples = self.samples.get(endpoint)
+        if samples is None or len(samples) < LATENCY_MIN_SAMPLES:
+            return None
+        return _percentile(sorted(samples), q)
+
+    def timeout(self, endpoint: str) -> float:
+        p99 = self.percentile(endpoint, 0.99)
+        if p99 is None:
+            return NWS_READ_TIMEOUT
+        return min(NWS_READ_TIMEOUT, max(MIN_TIMEOUT, p99 * TIMEOUT_MULTIPLIER))
+
+    def hedge_delay(self, endpoint: str) -> float | None:
+        delay = self.percentile(endpoint, HEDGE_PERCENTILE)
+        return None if delay is None else max(HEDGE_MIN_DELAY, delay)
+
+    def stats(self) -> dict[str, Any]:
+        result = {}
+        for endpoint, samples in self.samples.items():
+            ordered = sorted(samples)
+            result[endpoint] = {
+                "samples": len(ordered),
+                "p50_ms": round(_percentile(ordered, 0.5) * 1000, 1),
+                "p95_ms": round(_percentile(ordered, 0.95) * 1000, 1),
+                "p99_ms": round(_percentile(ordered, 0.99) * 1000, 1),
+                "timeout_s": round(self.timeout(endpoint), 2),
+            }
+        return result
+
+
+class CircuitBreaker:
+    """
+    업스트림 장애 시 빠르게 실패하도록 하는 회로 차단기
+
+    closed: 정상 / open: 요청 차단 / half_open: 대기 시간 후 시험 요청 하나만 허용
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.opens = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.cooldown:
+                self.rejected += 1
+                return False
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self.probing:
+                self.rejected += 1
+                return False
+            self.probing = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self.probing = False
+
+    def abandon(self) -> None:
+        """시험 요청이 결과 없이 취소된 경우 다음 요청이 다시 시험할 수 있게 한다"""
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.probing = False
+        if self.state == "half_open" or self.failures >= self.threshold:
+            if self.state != "open":
+                self.opens += 1
+                logger.warning(f"NWS circuit breaker opened after {self.failures} failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opens": self.opens,
+            "rejected": self.rejected,
+        }
+
+
+class RequestHedger:
+    """첫 요청이 늦으면 같은 요청을 하나 더 보내 먼저 성공한 응답을 사용"""
+
+    def __init__(self, max_ratio: float):
+        self.max_ratio = max_ratio
+        self.requests = 0
+        self.sent = 0
+        self.wins = 0
+
+    async def run(
+        self, attempt: Callable[[], Awaitable[Any]], delay: float | None
+    ) -> Any:
+        self.requests += 1
+        primary = asyncio.create_task(attempt())
+        tasks = {primary}
+        try:
+            if not HEDGE_ENABLED or delay is None:
+                return await primary
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            # 헤지 요청이 업스트림 부하를 키우지 않도록 비율을 제한
+            if not done and self.sent < self.max_ratio * self.requests:
+                self.sent += 1
+                tasks.add(asyncio.create_task(attempt()))
+            error: BaseException | None = None
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error if error is not None else RuntimeError("no attempt completed")
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": HEDGE_ENABLED,
+            "requests": self.requests,
+            "hedges_sent": self.sent,
+            "hedge_wins": self.wins,
+        }
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """업스트림 상태 이상으로 볼 오류인지 (4xx 등 요청 자체의 오류는 제외)"""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(error, (httpx.TransportError, TimeoutError))
+
+
+latency_tracker = LatencyTracker(LATENCY_WINDOW)
+circuit_breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+request_hedger = RequestHedger(HEDGE_MAX_RATIO)
+
+
+class AccessTracker:
+    """URL별 접근 빈도를 지수 감쇠 점수로 기록해 자주 조회되는 항목을 찾는다"""
+
+    def __init__(self, half_life: float):
+        self.decay = math.log(2) / half_life
+        self.scores: dict[str, tuple[float, float]] = {}
+
+    def _score(self, url: str, now: float) -> float:
+        score, last = self.scores.get(url, (0.0, now))
+        return score * math.exp(-self.decay * (now - last))
+
+    def touch(self, url: str) -> None:
+        now = time.monotonic()
+        self.scores[url] = (self._score(url, now) + 1, now)
+
+    def hot(self, min_score: float, limit: int) -> list[str]:
+        """점수가 min_score 이상인 URL을 점수 순으로 반환하고 식은 항목은 정리"""
+        now = time.monotonic()
+        current = {url: self._score(url, now) for url in self.scores}
+        for url, score in current.items():
+            if score < 0.05:
+                del self.scores[url]
+        ranked = heapq.nlargest(limit, current.items(), key=lambda item: item[1])
+        return [url for url, score in ranked if score >= min_score]
+
+
+access_tracker = AccessTracker(HOT_HALF_LIFE)
+background_refreshes: set[asyncio.Task] = set()
+
+
+def refresh_in_background(url: str, cached: CachedResponse) -> None:
+    """응답을 기다리지 않고 캐시 항목을 갱신 (이미 요청 중이면 생략)"""
+    if url in single_flight.in_flight:
+        return
+    http_cache.background_refreshes += 1
+    task = asyncio.create_task(
+        single_flight.do(url, lambda: fetch_nws(url, cached, cached.parse))
+    )
+    background_refreshes.add(task)
+    task.add_done_callback(background_refreshes.discard)
+
+
+async def refresh_hot_entries() -> None:
+    """인기 항목이 만료되기 전에 주기적으로 미리 갱신해 사용자 요청이 기다리지 않게 한다"""
+    while True:
+        await asyncio.sleep(REFRESH_INTERVAL)
+        now = time.monotonic()
+        for url in access_tracker.hot(HOT_MIN_SCORE, REFRESH_MAX_PER_SWEEP):
+            entry = http_cache.entries.get(url)
+            if entry is None or entry.lifetime <= 0:
+                continue
+            # 유효 시간이 짧은 응답(경보 등)은 유효 시간의 절반이 지나면 갱신
+            if entry.expires_at - now <= min(REFRESH_AHEAD, entry.lifetime / 2):
+                refresh_in_background(url, entry)
+
+
+async def make_nws_request(
+    url: str, parse: ResponseParser = read_json
+) -> dict[str, Any] | None:
+    """Make a request to the NWS API with proper error handling.
+
+    Fresh cached responses are returned without a request; recently expired
+    ones are returned immediately while they are refreshed in the background,
+    and older ones are revalidated with If-None-Match/If-Modified-Since.
+    Concurrent calls for the same URL share a single upstream request.
+    `parse` reads the body; a URL must always be fetched with the same parser.
+    """
+    access_tracker.touch(url)
+    cached = http_cache.get(url) if http_cache.max_bytes > 0 else None
+    if cached is not None and cached.is_fresh():
+        http_cache.hits += 1
+        return cached.data
+    if cached is not None and cached.is_usable_stale():
+        http_cache.stale_served += 1
+        refresh_in_background(url, cached)
+        return cached.data
+    return await single_flight.do(url, lambda: fetch_nws(url, cached, parse))
+
+
+async def fetch_nws(
+    url: str, cached: CachedResponse | None, parse: ResponseParser
+) -> dict[str, Any] | None:
+    """
+    NWS에 실제 요청을 보내고 응답을 캐시에 반영
+
+    엔드포인트별 지연 시간으로 정한 타임아웃을 적용하고, p95보다 늦으면 헤지 요청을 보낸다.
+    회로 차단기가 열려 있으면 요청 없이 바로 실패한다.
+    """
+    if not circuit_breaker.allow():
+        logger.warning(f"Circuit open, skipping request to {url}")
+        return None
+    endpoint = latency_tracker.endpoint(url)
+    timeout = latency_tracker.timeout(endpoint)
+
+    async def attempt() -> tuple[httpx.Response, dict[str, Any] | None, int]:
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(timeout):
+                async with get_http_client().stream(
+                    "GET",
+                    url,
+                    headers=cached.validators() if cached else None,
+                    extensions={"trace": connection_stats.trace()},
+                ) as response:
+                    connection_stats.record_response(response)
+                    if cached is not None and response.status_code == 304:
+                        result: tuple[dict[str, Any] | None, int] = (None, 0)
+                    else:
+                        response.raise_for_status()
+                        result = await parse(response)
+        except TimeoutError:
+            latency_tracker.record_timeout(endpoint, timeout)
+            raise
+        latency_tracker.record(endpoint, time.monotonic() - started)
+        return response, *result
+
     logger.info(f"Making request to {url}")
-    async with httpx.AsyncClient() as client:
+    try:
+        response, data, size = await request_hedger.run(
+            attempt, latency_tracker.hedge_delay(endpoint)
+        )
+    except asyncio.CancelledError:
+        circuit_breaker.abandon()
+        raise
+    except Exception as e:
+        if is_upstream_failure(e):
+            circuit_breaker.record_failure()
+        else:
+            # 4xx나 파싱 오류는 업스트림이 건강하다는 근거도 아니므로 상태를 바꾸지 않는다
+            logger.warning(f"Request to {url} failed: {e!r}")
+            circuit_breaker.abandon()
+        return None
+    circuit_breaker.record_success()
+    if data is None and cached is not None:
+        http_cache.revalidated += 1
+        http_cache.refresh(url, cached, response)
+        return cached.data
+    http_cache.misses += 1
+    if http_cache.max_bytes > 0:
+        http_cache.store(url, response, data, size, parse)
+    return data
+
+
+class GridCache:
+    """
+    반올림한 좌표 → 예보 URL 매핑을 메모리와 디스크(JSON)에 저장하는 캐시
+
+    NWS 그리드 매핑은 거의 바뀌지 않으므로 만료 없이 보관하고,
+    캐시에 있으면 /points 요청을 건너뛴다.
+    """
+
+    def __init__(self, path: Path, rounding: int):
+        self.path = path
+        self.rounding = rounding
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._loaded = False
+
+    def key(self, latitude: float, longitude: float) -> str:
+        return f"{latitude:.{self.rounding}f},{longitude:.{self.rounding}f}"
+
+    def _load(self) -> None:
+        self._loaded = True
         try:
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
-        except Exception:
+            self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable grid cache {self.path}: {e}")
+
+    def get(self, key: str) -> str | None:
+        if not self._loaded:
+            self._load()
+        entry = self.entries.get(key)
+        if entry is None or not entry.get("forecast"):
+            self.misses += 1
             return None
+        self.hits += 1
+        return entry["forecast"]
+
+    def put(self, key: str, properties: dict[str, Any], save: bool = True) -> None:
+        """예보 URL이 있는 /points 응답만 저장 (없는 응답을 저장하면 계속 실패로 남는다)"""
+        if not properties.get("forecast"):
+            return
+        if not self._loaded:
+            self._load()
+        grid_id, grid_x, grid_y = (
+            properties.get("gridId"),
+            properties.get("gridX"),
+            properties.get("gridY"),
+        )
+        self.entries[key] = {
+            "forecast": properties["forecast"],
+            "grid": f"{grid_id}/{grid_x},{grid_y}",
+            "saved": int(time.time()),
+        }
+        if save:
+            self.save()
+
+    def save(self) -> None:
+        """임시 파일에 쓴 뒤 교체해 동시에 실행 중인 다른 서버가 깨진 파일을 읽지 않게 한다"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(self.entries, indent=1), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to save grid cache {self.path}: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "rounding": self.rounding,
+            "path": str(self.path),
+        }
+
+
+grid_cache = GridCache(GRID_CACHE_PATH, GRID_ROUNDING)
+
+
+async def resolve_forecast_url(
+    latitude: float, longitude: float, save: bool = True
+) -> str | None:
+    """좌표의 예보 URL을 반환 (캐시에 없을 때만 /points 요청)"""
+    key = grid_cache.key(latitude, longitude)
+    if forecast_url := grid_cache.get(key):
+        return forecast_url
+
+    # 캐시 키와 같은 반올림 좌표로 요청해 저장된 매핑이 요청 지점과 일치하도록 한다
+    points_data = await make_nws_request(f"{NWS_API_BASE}/points/{key}")
+    if not points_data:
+        return None
+    properties = points_data.get("properties") or {}
+    grid_cache.put(key, properties, save=save)
+    return properties.get("forecast")
+
+
+def load_prewarm_locations(path: Path) -> list[list[float]]:
+    """미리 채울 좌표 파일([[위도, 경도], ...] JSON)을 읽고 형식을 확인"""
+    locations = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(locations, list) or not all(
+        isinstance(pair, list)
+        and len(pair) == 2
+        and all(isinstance(value, (int, float)) for value in pair)
+        for pair in locations
+    ):
+        raise ValueError("expected a JSON list of [latitude, longitude] pairs")
+    return locations
+
+
+async def prewarm_grid(locations: list[list[float]]) -> dict[str, Any]:
+    """여러 좌표의 그리드 매핑을 한 번에 캐시에 채운다 (디스크 저장은 마지막에 한 번)"""
+    semaphore = asyncio.Semaphore(GRID_PREWARM_CONCURRENCY)
+    failed: list[str] = []
+
+    async def warm(latitude: float, longitude: float) -> None:
+        async with semaphore:
+            if await resolve_forecast_url(latitude, longitude, save=False) is None:
+                failed.append(grid_cache.key(latitude, longitude))
+
+    await asyncio.gather(*(warm(lat, lon) for lat, lon in locations))
+    grid_cache.save()
+    logger.info(f"Prewarmed {len(locations)} grid points ({len(failed)} failed)")
+    return {"requested": len(locations), "failed": failed, "grid": grid_cache.stats()}
+
+
+class FeaturePropertiesStream:
+    """
+    GeoJSON FeatureCollection을 조각 단위로 읽으며 각 feature의 properties만 추출
+
+    문서 전체를 한 번에 파싱하지 않는다. "features" 배열이 나올 때까지는 괄호 깊이와
+    문자열 상태만 추적하고, 그 뒤로는 feature를 하나씩 디코딩해 필요한 필드만 남긴다.
+    처리한 앞부분은 버퍼에서 지우므로 메모리 사용량은 feature 하나 크기로 제한된다.
+    """
+
+    _STRUCTURE = re.compile(r'["{}\[\]:]')
+    _IN_STRING = re.compile(r'["\\]')
+    _SEPARATOR = re.compile(r"[\s,]*")
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, fields: tuple[str, ...]):
+        self.fields = fields
+        self.buffer = ""
+        self.pos = 0
+        # "features" 배열 앞부분을 훑는 동안의 상태
+        self.depth = 0
+        self.in_string = False
+        self.string_start = 0
+        self.last_string = ""
+        self.key = ""
+        self.in_features = False
+        self.finished = False
+        # 불완전한 feature 때문에 디코딩을 멈춘 상태
+        self.stalled = False
+
+    def feed(self, text: str) -> list[dict[str, Any]]:
+        self.buffer += text
+        if not self.in_features and not self.finished:
+            self._find_features()
+        found: list[dict[str, Any]] = []
+        # 객체를 닫는 문자가 새로 들어오기 전까지는 같은 feature를 다시 디코딩하지 않는다
+        if self.in_features and (not self.stalled or "}" in text):
+            found = self._read_features()
+        # 문자열을 읽는 중이면 그 시작부터, 아니면 처리한 위치까지 버린다
+        keep = min(self.pos, self.string_start) if self.in_string else self.pos
+        self.buffer = self.buffer[keep:]
+        self.pos -= keep
+        self.string_start -= keep
+        return found
+
+    def close(self) -> None:
+        if not self.finished:
+            raise ValueError("GeoJSON stream ended before the features array was closed")
+
+    def _find_features(self) -> None:
+        buffer = self.buffer
+        pos = self.pos
+        while True:
+            if self.in_string:
+                match = self._IN_STRING.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                if match.group() == "\\":
+                    if match.end() >= len(buffer):
+                        # 이스케이프 문자가 다음 조각에 걸친 경우
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                self.in_string = False
+                self.last_string = buffer[self.string_start : match.start()]
+                pos = match.end()
+                continue
+
+            match = self._STRUCTURE.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            char, pos = match.group(), match.end()
+            if char == '"':
+                self.in_string = True
+                self.string_start = pos
+            elif char == ":":
+                if self.depth == 1:
+                    self.key = self.last_string
+            elif char in "{[":
+                self.depth += 1
+                if char == "[" and self.depth == 2 and self.key == "features":
+                    self.in_features = True
+                    break
+            else:
+                self.depth -= 1
+        self.pos = pos
+
+    def _read_features(self) -> list[dict[str, Any]]:
+        found = []
+        buffer = self.buffer
+        pos = self.pos
+        while True:
+            pos = self._SEPARATOR.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                self.in_features = False
+                self.finished = True
+                pos += 1
+                break
+            try:
+                feature, pos = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                self.stalled = True
+                break
+            self.stalled = False
+            properties = feature.get("properties") or {}
+            found.append(
+                {key: properties[key] for key in self.fields if key in properties}
+            )
+        self.pos = pos
+        return found
+
+
+async def read_alert_properties(response: httpx.Response) -> tuple[dict[str, Any], int]:
+    """경보 응답을 스트리밍으로 읽어 ALERT_FIELDS만 남긴 feature 목록을 만든다"""
+    stream = FeaturePropertiesStream(ALERT_FIELDS)
+    features = []
+    async for chunk in response.aiter_text():
+        features.extend({"properties": props} for props in stream.feed(chunk))
+    stream.close()
+    # 캐시 크기는 원본이 아니라 실제로 보관하는 추출 결과 기준으로 계산
+    size = sum(len(v) for f in features for v in f["properties"].values() if v)
+    return {"features": features}, size
 
 
 def format_alert(feature: dict) -> str:
@@ -57,15 +1100,100 @@ Instructions: {props.get('instruction', 'No specific instructions provided')}
 """
 
 
+def filter_alerts(
+    features: list[dict],
+    severity: list[str] | None,
+    event: str | None,
+    max_results: int | None,
+) -> list[dict]:
+    """심각도(정확히 일치)와 이벤트 이름(부분 일치)으로 경보를 거르고 개수를 제한"""
+    severities = {level.strip().lower() for level in severity or []}
+    event_text = (event or "").strip().lower()
+    selected: list[dict] = []
+    for feature in features:
+        if max_results is not None and len(selected) >= max_results:
+            break
+        props = feature["properties"]
+        if severities and (props.get("severity") or "").lower() not in severities:
+            continue
+        if event_text and event_text not in (props.get("event") or "").lower():
+            continue
+        selected.append(feature)
+    return selected
+
+
+def check_max_results(max_results: int | None) -> None:
+    if max_results is not None and max_results < 1:
+        raise ValueError("max_results must be at least 1")
+
+
+def select_fields(
+    fields: list[str] | None, available: tuple[str, ...], default: tuple[str, ...]
+) -> tuple[str, ...]:
+    if not fields:
+        return default
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)} (available: {', '.join(available)})"
+        )
+    return tuple(dict.fromkeys(fields))
+
+
+def to_compact_json(value: Any) -> str:
+    """공백 없는 JSON (LLM 입력 토큰을 줄이기 위해 들여쓰기와 ASCII 이스케이프 생략)"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def project_period(period: dict, fields: tuple[str, ...]) -> dict[str, Any]:
+    values = dict(period)
+    values["precipitationChance"] = (period.get("probabilityOfPrecipitation") or {}).get(
+        "value"
+    )
+    return {field: values.get(field) for field in fields}
+
+
 @mcp.tool()
-async def get_alerts(state: str) -> str:
+async def get_alerts(
+    state: str,
+    severity: list[str] | None = None,
+    event: str | None = None,
+    max_results: int | None = None,
+    format: Literal["text", "json"] = "text",
+    fields: list[str] | None = None,
+) -> str:
     """Get weather alerts for a US state.
 
+    With format="json" the result is compact JSON matching the
+    schema://weather/alerts resource: {"total": n, "alerts": [{...}]}.
+
     Args:
         state: Two-letter US state code (e.g. CA, NY)
+        severity: Only include these severities (Extreme, Severe, Moderate, Minor, Unknown)
+        event: Only include alerts whose event name contains this text (e.g. "Flood")
+        max_results: Maximum number of alerts to return (at least 1)
+        format: "text" for readable prose (default) or "json" for compact JSON
+        fields: Alert fields to include in JSON output (default: event, severity,
+            urgency, areaDesc, headline, expires; also effective, certainty,
+            description, instruction)
     """
-    url = f"{NWS_API_BASE}/alerts/active/area/{state}"
-    data = await make_nws_request(url)
+    check_max_results(max_results)
+    if format == "json":
+        keys = select_fields(fields, ALERT_FIELDS, ALERT_DEFAULT_FIELDS)
+
+    # 대소문자만 다른 요청도 같은 URL로 모아 동시 요청 병합과 캐시를 공유
+    url = f"{NWS_API_BASE}/alerts/active/area/{state.strip().upper()}"
+    data = await make_nws_request(url, parse=read_alert_properties)
+
+    if format == "json":
+        if not data or "features" not in data:
+            return to_compact_json({"error": "Unable to fetch alerts."})
+        features = filter_alerts(data["features"], severity, event, max_results)
+        alerts = [
+            {key: feature["properties"].get(key) for key in keys}
+            for feature in features
+        ]
+        return to_compact_json({"total": len(data["features"]), "alerts": alerts})
 
     if not data or "features" not in data:
         return "Unable to fetch alerts or no alerts found."
@@ -73,48 +1201,175 @@ async def get_alerts(state: str) -> str:
     if not data["features"]:
         return "No active alerts for this state."
 
-    alerts = [format_alert(feature) for feature in data["features"]]
+    features = filter_alerts(data["features"], severity, event, max_results)
+    if not features:
+        return "No active alerts match the given filters."
+
+    alerts = [format_alert(feature) for feature in features]
+    if len(features) < len(data["features"]):
+        alerts.append(f"(showing {len(features)} of {len(data['features'])} alerts)")
     return "\n---\n".join(alerts)
 
 
 @mcp.tool()
-async def get_forecast(latitude: float, longitude: float) -> str:
-    """Get weather forecast for a location.
+async def get_alerts_for_states(
+    states: list[str],
+    severity: list[str] | None = None,
+    event: str | None = None,
+    max_results: int | None = None,
+) -> dict[str, str]:
+    """Get weather alerts for several US states in one call.
 
     Args:
-        latitude: Latitude of the location
-        longitude: Longitude of the location
+        states: Two-letter US state codes (e.g. ["CA", "NY"])
+        severity: Only include these severities (Extreme, Severe, Moderate, Minor, Unknown)
+        event: Only include alerts whose event name contains this text
+        max_results: Maximum number of alerts per state (at least 1)
     """
-    # First get the forecast grid endpoint
-    points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-    points_data = await make_nws_request(points_url)
+    check_max_results(max_results)
+    codes = list(dict.fromkeys(state.strip().upper() for state in states))
+    if len(codes) > ALERTS_BATCH_MAX:
+        raise ValueError(f"At most {ALERTS_BATCH_MAX} states per call")
+    alerts = await asyncio.gather(
+        *(get_alerts(code, severity, event, max_results) for code in codes)
+    )
+    return dict(zip(codes, alerts))
 
-    if not points_data:
-        return "Unable to fetch forecast data for this location."
 
-    # Get the forecast URL from the points response
-    forecast_url = points_data["properties"]["forecast"]
+class ForecastError(Exception):
+    """예보를 가져오지 못했을 때 사용자에게 보여줄 메시지를 담는 예외"""
+
+
+async def fetch_forecast_periods(latitude: float, longitude: float) -> list[dict]:
+    """좌표의 예보 기간 목록을 가져온다 (실패 시 ForecastError)"""
+    # First get the forecast grid endpoint (cached per rounded coordinate)
+    forecast_url = await resolve_forecast_url(latitude, longitude)
+
+    if not forecast_url:
+        raise ForecastError("Unable to fetch forecast data for this location.")
+
     forecast_data = await make_nws_request(forecast_url)
 
     if not forecast_data:
-        return "Unable to fetch detailed forecast."
+        raise ForecastError("Unable to fetch detailed forecast.")
 
-    # Format the periods into a readable forecast
-    periods = forecast_data["properties"]["periods"]
-    forecasts = []
-    for period in periods[:5]:  # Only show next 5 periods
-        forecast = f"""
+    return forecast_data["properties"]["periods"]
+
+
+def format_period(period: dict) -> str:
+    """Format a forecast period into a readable string."""
+    return f"""
 {period['name']}:
 Temperature: {period['temperature']}°{period['temperatureUnit']}
 Wind: {period['windSpeed']} {period['windDirection']}
 Forecast: {period['detailedForecast']}
 """
-        forecasts.append(forecast)
 
+
+@mcp.tool()
+async def get_forecast(
+    latitude: float,
+    longitude: float,
+    format: Literal["text", "json"] = "text",
+    fields: list[str] | None = None,
+) -> str:
+    """Get weather forecast for a location.
+
+    With format="json" the result is compact JSON matching the
+    schema://weather/forecast resource: {"periods": [{...}]}.
+
+    Args:
+        latitude: Latitude of the location
+        longitude: Longitude of the location
+        format: "text" for readable prose (default) or "json" for compact JSON
+        fields: Period fields to include in JSON output (default: name, temperature,
+            temperatureUnit, windSpeed, windDirection, shortForecast; also startTime,
+            endTime, isDaytime, precipitationChance, detailedForecast)
+    """
+    if format == "json":
+        keys = select_fields(fields, FORECAST_FIELDS, FORECAST_DEFAULT_FIELDS)
+    try:
+        periods = await fetch_forecast_periods(latitude, longitude)
+    except ForecastError as e:
+        return to_compact_json({"error": str(e)}) if format == "json" else str(e)
+
+    if format == "json":
+        return to_compact_json(
+            {"periods": [project_period(p, keys) for p in periods[:FORECAST_PERIODS]]}
+        )
+
+    # Format the periods into a readable forecast
+    forecasts = [format_period(period) for period in periods[:FORECAST_PERIODS]]
     return "\n---\n".join(forecasts)
 
 
+@mcp.tool()
+async def get_forecasts(locations: list[list[float]]) -> list[dict[str, Any]]:
+    """Get weather forecasts for several locations in one call.
+
+    Locations are fetched concurrently; a failure for one location is reported
+    in its own entry and does not affect the others.
+
+    Args:
+        locations: List of [latitude, longitude] pairs
+    """
+    if len(locations) > FORECAST_BATCH_MAX:
+        raise ValueError(f"At most {FORECAST_BATCH_MAX} locations per call")
+    semaphore = asyncio.Semaphore(FORECAST_BATCH_CONCURRENCY)
+
+    async def forecast_for(location: list[float]) -> dict[str, Any]:
+        # 잘못된 항목 하나가 배치 전체를 실패시키지 않도록 항목별로 검사
+        if len(location) != 2:
+            return {
+                "location": location,
+                "error": "Expected a [latitude, longitude] pair",
+            }
+        latitude, longitude = location
+        result: dict[str, Any] = {"latitude": latitude, "longitude": longitude}
+        async with semaphore:
+            try:
+                periods = await fetch_forecast_periods(latitude, longitude)
+            except ForecastError as e:
+                result["error"] = str(e)
+                return result
+            except Exception as e:
+                logger.exception(f"Forecast failed for {latitude},{longitude}")
+                result["error"] = f"Unexpected error: {e}"
+                return result
+        result["forecast"] = "\n---\n".join(
+            format_period(p) for p in periods[:FORECAST_PERIODS]
+        )
+        return result
+
+    return await asyncio.gather(*(forecast_for(location) for location in locations))
+
+
+@mcp.tool()
+async def server_stats() -> dict[str, Any]:
+    """Report NWS connection reuse statistics for this server process."""
+    return {
+        "http": connection_stats.snapshot(),
+        "http_cache": http_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "hot": access_tracker.hot(HOT_MIN_SCORE, 10),
+        "grid": grid_cache.stats(),
+        "upstream": latency_tracker.stats(),
+        "hedging": request_hedger.stats(),
+        "breaker": circuit_breaker.stats(),
+    }
+
+
+@mcp.tool()
+async def prewarm_forecast_grid(locations: list[list[float]]) -> dict[str, Any]:
+    """Resolve and cache forecast grid points for many locations at once.
+
+    Args:
+        locations: List of [latitude, longitude] pairs
+    """
+    return await prewarm_grid(locations)
+
+
 if __name__ == "__main__":
-    print("Starting MCP server...")
+    print("Starting MCP server...", file=sys.stderr)
     # Initialize and run the server
     mcp.run(transport="stdio")
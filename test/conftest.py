@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# weather 서버는 스크립트로 실행되므로 src/server를 import 경로에 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src", "server"))
+os.environ.setdefault("NWS_LOG_LEVEL", "WARNING")
+
+
+@pytest.fixture
+def standin():
+    """지연 시간 등을 테스트 중에 바꿀 수 있는 로컬 NWS 대역 서버"""
+    from nws_standin import StandInConfig, start_standin
+
+    server = start_standin(StandInConfig())
+    yield server
+    server.shutdown()
+    server.server_close()
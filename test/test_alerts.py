@@ -0,0 +1,102 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+import wheather_mcp_server as weather
+
+FIXTURE = Path(weather.__file__).parent / "fixtures" / "nws" / "alerts.json"
+
+
+def feature(event: str, severity: str) -> dict:
+    return {"properties": {"event": event, "severity": severity}}
+
+
+FEATURES = [
+    feature("Flood Warning", "Severe"),
+    feature("Flash Flood Watch", "Moderate"),
+    feature("Wind Advisory", "Minor"),
+    feature("Tornado Warning", "Extreme"),
+]
+
+
+def feed_in_chunks(text: str, size: int) -> list[dict]:
+    stream = weather.FeaturePropertiesStream(weather.ALERT_FIELDS)
+    found = []
+    for start in range(0, len(text), size):
+        found += stream.feed(text[start : start + size])
+    stream.close()
+    return found
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 4096, 10**7])
+def test_stream_matches_full_parse(chunk_size):
+    text = FIXTURE.read_text(encoding="utf-8")
+    expected = [
+        {k: f["properties"][k] for k in weather.ALERT_FIELDS if k in f["properties"]}
+        for f in json.loads(text)["features"]
+    ]
+
+    assert feed_in_chunks(text, chunk_size) == expected
+
+
+def test_stream_handles_tricky_strings_and_key_order():
+    document = {
+        "title": 'braces { [ and "quotes" \\ before',
+        "nested": {"features": ["not the top-level array"]},
+        "features": [
+            {"properties": {"event": 'Storm "Ω" \\ }]', "severity": "Minor"}},
+            {"geometry": None, "properties": None},
+            {"properties": {"event": "Heat", "unused": {"deep": [1, 2]}}},
+        ],
+        "pagination": {"next": "x"},
+    }
+    text = json.dumps(document, ensure_ascii=False)
+
+    assert feed_in_chunks(text, 3) == [
+        {"event": 'Storm "Ω" \\ }]', "severity": "Minor"},
+        {},
+        {"event": "Heat"},
+    ]
+
+
+def test_stream_without_features_array_fails_on_close():
+    stream = weather.FeaturePropertiesStream(weather.ALERT_FIELDS)
+    assert stream.feed('{"type": "FeatureCollection", "features": [{"prop') == []
+    with pytest.raises(ValueError):
+        stream.close()
+
+
+def test_stream_keeps_buffer_small():
+    stream = weather.FeaturePropertiesStream(("event",))
+    one = json.dumps({"properties": {"event": "x"}, "geometry": {"c": [0] * 200}})
+    stream.feed('{"features": [')
+    for _ in range(200):
+        stream.feed(one + ",")
+        assert len(stream.buffer) < 2 * len(one)
+
+
+def test_filter_by_severity_and_event():
+    selected = weather.filter_alerts(FEATURES, ["severe", " Extreme "], None, None)
+    assert [f["properties"]["event"] for f in selected] == [
+        "Flood Warning",
+        "Tornado Warning",
+    ]
+
+    selected = weather.filter_alerts(FEATURES, None, "flood", None)
+    assert len(selected) == 2
+
+
+def test_filter_max_results_limits_after_filtering():
+    selected = weather.filter_alerts(FEATURES, None, "warning", 1)
+    assert [f["properties"]["event"] for f in selected] == ["Flood Warning"]
+    assert weather.filter_alerts(FEATURES, None, None, 0) == []
+
+
+@pytest.mark.parametrize("max_results", [0, -1])
+def test_tools_reject_non_positive_max_results(max_results):
+    with pytest.raises(ValueError):
+        asyncio.run(weather.get_alerts("KS", max_results=max_results))
+    with pytest.raises(ValueError):
+        asyncio.run(weather.get_alerts_for_states(["KS"], max_results=max_results))
@@ -0,0 +1,107 @@
+import asyncio
+
+import httpx
+import pytest
+
+import wheather_mcp_server as weather
+
+URL = "https://api.weather.gov/alerts/active/area/KS"
+
+
+def open_breaker(breaker: weather.CircuitBreaker) -> None:
+    for _ in range(breaker.threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+
+
+def test_opens_after_threshold_and_rejects():
+    breaker = weather.CircuitBreaker(threshold=3, cooldown=60)
+    open_breaker(breaker)
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.stats()["opens"] == 1
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_half_open_allows_one_probe():
+    breaker = weather.CircuitBreaker(threshold=1, cooldown=0)
+    open_breaker(breaker)
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = weather.CircuitBreaker(threshold=5, cooldown=0)
+    open_breaker(breaker)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.stats()["opens"] == 2
+
+
+def test_abandoned_probe_lets_next_request_probe():
+    breaker = weather.CircuitBreaker(threshold=1, cooldown=0)
+    open_breaker(breaker)
+    assert breaker.allow()
+    breaker.abandon()
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+
+@pytest.fixture
+def nws(monkeypatch):
+    """MockTransport로 응답을 정하고, 새 회로 차단기를 반환"""
+    breaker = weather.CircuitBreaker(threshold=1, cooldown=0)
+    monkeypatch.setattr(weather, "circuit_breaker", breaker)
+    monkeypatch.setattr(weather, "HEDGE_ENABLED", False)
+    monkeypatch.setattr(weather, "http_cache", weather.HTTPCache(0))
+
+    def install(handler):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(weather, "_http_client", client)
+
+    return breaker, install
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        httpx.Response(200, content=b"{not json"),
+        httpx.Response(404, json={"title": "Not Found"}),
+    ],
+)
+def test_non_upstream_error_does_not_close_breaker(nws, response):
+    breaker, install = nws
+    install(lambda request: response)
+    open_breaker(breaker)
+
+    # 대기 시간이 지나 시험 요청이 나가지만, 파싱 오류는 복구의 근거가 아니다
+    assert asyncio.run(weather.fetch_nws(URL, None, weather.read_json)) is None
+    assert breaker.state == "half_open"
+    assert breaker.failures == 1
+    assert breaker.allow()
+
+
+def test_parsed_response_closes_breaker(nws):
+    breaker, install = nws
+    install(lambda request: httpx.Response(200, json={"features": []}))
+    open_breaker(breaker)
+
+    assert asyncio.run(weather.fetch_nws(URL, None, weather.read_json)) == {
+        "features": []
+    }
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+
+def test_server_error_counts_as_failure(nws):
+    breaker, install = nws
+    install(lambda request: httpx.Response(503))
+
+    assert asyncio.run(weather.fetch_nws(URL, None, weather.read_json)) is None
+    assert breaker.state == "open"
@@ -0,0 +1,33 @@
+import asyncio
+
+import wheather_mcp_server as weather
+
+PERIOD = {
+    "name": "Tonight",
+    "temperature": 50,
+    "temperatureUnit": "F",
+    "windSpeed": "5 mph",
+    "windDirection": "N",
+    "detailedForecast": "Clear.",
+}
+
+
+def test_bad_batch_entries_fail_only_themselves(monkeypatch):
+    async def fake_periods(latitude, longitude):
+        if latitude < 0:
+            raise weather.ForecastError("Unable to fetch forecast data for this location.")
+        return [PERIOD]
+
+    monkeypatch.setattr(weather, "fetch_forecast_periods", fake_periods)
+
+    results = asyncio.run(
+        weather.get_forecasts([[40.0, -97.0], [40.0], [1.0, 2.0, 3.0], [-1.0, 2.0]])
+    )
+
+    assert "Tonight" in results[0]["forecast"]
+    assert results[1] == {
+        "location": [40.0],
+        "error": "Expected a [latitude, longitude] pair",
+    }
+    assert results[2]["location"] == [1.0, 2.0, 3.0] and "error" in results[2]
+    assert results[3]["error"].startswith("Unable to fetch")
@@ -0,0 +1,34 @@
+import asyncio
+
+import wheather_mcp_server as weather
+
+
+def test_points_response_without_forecast_is_not_cached(tmp_path):
+    cache = weather.GridCache(tmp_path / "grid.json", rounding=4)
+    key = cache.key(39.7456, -97.0892)
+
+    cache.put(key, {"gridId": "TOP", "gridX": 32, "gridY": 81})
+
+    assert cache.get(key) is None
+    assert not (tmp_path / "grid.json").exists()
+
+    cache.put(key, {"forecast": "https://example/forecast", "gridId": "TOP"})
+    assert cache.get(key) == "https://example/forecast"
+
+
+def test_unusable_prewarm_file_does_not_stop_startup(tmp_path, monkeypatch):
+    bad_files = {
+        "missing": tmp_path / "missing.json",
+        "malformed": tmp_path / "malformed.json",
+        "wrong shape": tmp_path / "shape.json",
+    }
+    bad_files["malformed"].write_text("[[39.7, -97.0]", encoding="utf-8")
+    bad_files["wrong shape"].write_text('{"lat": 39.7}', encoding="utf-8")
+
+    async def start_and_stop():
+        async with weather.lifespan(weather.mcp):
+            pass
+
+    for path in bad_files.values():
+        monkeypatch.setattr(weather, "GRID_PREWARM_FILE", str(path))
+        asyncio.run(start_and_stop())
@@ -0,0 +1,122 @@
+import time
+
+import httpx
+import pytest
+
+import wheather_mcp_server as weather
+
+URL = "https://api.weather.gov/gridpoints/TOP/32,81/forecast"
+
+
+def response(headers: dict[str, str], status: int = 200) -> httpx.Response:
+    return httpx.Response(status, headers=headers)
+
+
+def store(cache: weather.HTTPCache, url: str, headers: dict[str, str], size=10):
+    cache.store(url, response(headers), {"url": url}, size, weather.read_json)
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({"Cache-Control": "public, max-age=900"}, 900.0),
+        ({"Cache-Control": "max-age=900", "Age": "100"}, 800.0),
+        ({"Cache-Control": "max-age=60", "Age": "600"}, 0.0),
+        ({"Cache-Control": "max-age=900", "Age": "abc"}, 900.0),
+        ({"Cache-Control": "max-age=900", "Age": "nan"}, 900.0),
+        ({"Cache-Control": "max-age=900", "Age": "-5"}, 900.0),
+        ({"Cache-Control": "max-age=soon"}, 0.0),
+        ({"Cache-Control": "no-cache, max-age=900"}, 0.0),
+        ({"Cache-Control": "no-store"}, None),
+        (
+            {
+                "Date": "Mon, 19 Oct 2026 00:00:00 GMT",
+                "Expires": "Mon, 19 Oct 2026 00:05:00 GMT",
+            },
+            300.0,
+        ),
+        ({"Expires": "not a date"}, 0.0),
+        ({}, 0.0),
+    ],
+)
+def test_freshness_lifetime(headers, expected):
+    assert weather.freshness_lifetime(httpx.Headers(headers)) == expected
+
+
+def test_stale_window_prefers_directive_and_skips_must_revalidate():
+    headers = httpx.Headers(
+        {"Cache-Control": "max-age=60, stale-while-revalidate=30"}
+    )
+    assert weather.stale_window(URL, headers, 60) == 30.0
+
+    headers = httpx.Headers({"Cache-Control": "max-age=60, must-revalidate"})
+    assert weather.stale_window(URL, headers, 60) == 0.0
+    assert weather.stale_window(URL, httpx.Headers({}), 0) == 0.0
+
+
+def test_alerts_are_not_served_stale_by_default():
+    alerts = "https://api.weather.gov/alerts/active/area/KS"
+    headers = httpx.Headers({"Cache-Control": "max-age=30"})
+    assert weather.stale_window(URL, headers, 30) == weather.STALE_WHILE_REVALIDATE
+    assert weather.stale_window(alerts, headers, 30) == 0.0
+
+    headers = httpx.Headers({"Cache-Control": "max-age=30, stale-while-revalidate=60"})
+    assert weather.stale_window(alerts, headers, 30) == 0.0
+
+    cache = weather.HTTPCache(max_bytes=1000)
+    store(cache, alerts, {"Cache-Control": "max-age=30"})
+    assert cache.get(alerts).stale_for == 0.0
+
+
+def test_store_keeps_fresh_and_revalidatable_responses():
+    cache = weather.HTTPCache(max_bytes=1000)
+
+    store(cache, URL, {"Cache-Control": "max-age=60"})
+    entry = cache.get(URL)
+    assert entry is not None and entry.is_fresh()
+
+    # 유효 시간은 0이지만 ETag가 있으면 재검증용으로 보관
+    store(cache, "u2", {"ETag": '"v1"'})
+    entry = cache.get("u2")
+    assert entry is not None and not entry.is_fresh()
+    assert entry.validators() == {"If-None-Match": '"v1"'}
+
+    # 재사용도 재검증도 못 하는 응답, 저장 금지 응답은 보관하지 않음
+    store(cache, "u3", {})
+    store(cache, "u4", {"Cache-Control": "no-store"})
+    assert cache.get("u3") is None and cache.get("u4") is None
+
+    # 잘못된 Age 헤더는 0으로 보고 저장
+    store(cache, "u5", {"Cache-Control": "max-age=60", "Age": "x"})
+    assert cache.get("u5") is not None
+    assert cache.bytes == 30
+
+
+def test_store_evicts_least_recently_used_by_bytes():
+    cache = weather.HTTPCache(max_bytes=25)
+    fresh = {"Cache-Control": "max-age=60"}
+    for url in ("a", "b"):
+        store(cache, url, fresh)
+    cache.get("a")
+    store(cache, "c", fresh)
+
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.bytes == 20
+    assert cache.evictions == 1
+
+    store(cache, "huge", fresh, size=26)
+    assert cache.get("huge") is None
+
+
+def test_refresh_extends_lifetime_from_304():
+    cache = weather.HTTPCache(max_bytes=1000)
+    store(cache, URL, {"ETag": '"v1"'})
+    entry = cache.get(URL)
+    assert not entry.is_fresh()
+
+    not_modified = response({"Cache-Control": "max-age=60", "ETag": '"v2"'}, 304)
+    cache.refresh(URL, entry, not_modified)
+
+    assert entry.is_fresh()
+    assert entry.expires_at > time.monotonic() + 50
+    assert entry.etag == '"v2"'
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+import wheather_mcp_server as weather
+
+
+def test_timeouts_raise_the_adaptive_timeout(monkeypatch):
+    monkeypatch.setattr(weather, "LATENCY_MIN_SAMPLES", 20)
+    tracker = weather.LatencyTracker(window=200)
+    for _ in range(200):
+        tracker.record("alerts", 0.05)
+    assert tracker.timeout("alerts") == weather.MIN_TIMEOUT
+
+    # 시간 초과는 적어도 그 타임아웃만큼 걸린 표본이므로 p99를 끌어올린다
+    tracker.record_timeout("alerts", weather.MIN_TIMEOUT)
+    tracker.record_timeout("alerts", weather.MIN_TIMEOUT)
+    assert tracker.timeout("alerts") == weather.MIN_TIMEOUT * weather.TIMEOUT_MULTIPLIER
+
+
+@pytest.fixture
+def adaptive(monkeypatch):
+    """작은 값으로 줄인 적응형 타임아웃과 새 추적기/차단기 (HTTP 캐시, 헤지 없음)"""
+    monkeypatch.setattr(weather, "LATENCY_MIN_SAMPLES", 5)
+    monkeypatch.setattr(weather, "MIN_TIMEOUT", 0.1)
+    monkeypatch.setattr(weather, "NWS_READ_TIMEOUT", 5.0)
+    monkeypatch.setattr(weather, "HEDGE_ENABLED", False)
+    monkeypatch.setattr(weather, "latency_tracker", weather.LatencyTracker(5))
+    monkeypatch.setattr(weather, "circuit_breaker", weather.CircuitBreaker(5, 30))
+    monkeypatch.setattr(weather, "http_cache", weather.HTTPCache(0))
+    monkeypatch.setattr(weather, "_http_client", None)
+
+
+def test_recovers_after_upstream_latency_shift(standin, adaptive):
+    url = f"{standin.base_url}/alerts/active/area/KS"
+
+    async def scenario() -> list[bool]:
+        try:
+            for _ in range(10):
+                assert await weather.fetch_nws(url, None, weather.read_json)
+            assert weather.latency_tracker.timeout("alerts") == 0.1
+
+            standin.state.config.latency_ms = 250
+            return [
+                await weather.fetch_nws(url, None, weather.read_json) is not None
+                for _ in range(4)
+            ]
+        finally:
+            await weather.close_http_client()
+
+    outcomes = asyncio.run(scenario())
+    # 첫 요청은 예전 타임아웃으로 실패하지만, 그 뒤로는 늘어난 타임아웃 안에 응답을 받는다
+    assert outcomes == [False, True, True, True]
+    assert weather.circuit_breaker.state == "closed"
+    assert weather.latency_tracker.timeout("alerts") > 0.25
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+import wheather_mcp_server as weather
+
+
+@pytest.fixture
+def upstream(standin, monkeypatch):
+    """느린 대역 서버를 가리키고, 공유 상태를 새로 만든 weather 모듈"""
+    standin.state.config.latency_ms = 200
+    monkeypatch.setattr(weather, "NWS_API_BASE", standin.base_url)
+    monkeypatch.setattr(weather, "HEDGE_ENABLED", False)
+    monkeypatch.setattr(weather, "single_flight", weather.SingleFlight())
+    monkeypatch.setattr(weather, "latency_tracker", weather.LatencyTracker(200))
+    monkeypatch.setattr(weather, "circuit_breaker", weather.CircuitBreaker(5, 30))
+    monkeypatch.setattr(weather, "http_cache", weather.HTTPCache(0))
+    monkeypatch.setattr(weather, "_http_client", None)
+    return standin
+
+
+def run(scenario):
+    async def with_client():
+        try:
+            return await scenario()
+        finally:
+            await weather.close_http_client()
+
+    return asyncio.run(with_client())
+
+
+def test_concurrent_identical_requests_share_one_fetch(upstream):
+    url = f"{upstream.base_url}/alerts/active/area/KS"
+
+    async def scenario():
+        return await asyncio.gather(*[weather.make_nws_request(url) for _ in range(5)])
+
+    results = run(scenario)
+
+    assert results[0] is not None
+    assert all(result == results[0] for result in results)
+    assert upstream.state.requests == 1
+    assert weather.single_flight.stats() == {
+        "in_flight": 0,
+        "upstream_requests": 1,
+        "coalesced": 4,
+    }
+
+
+def test_state_codes_are_normalised_before_coalescing(upstream):
+    async def scenario():
+        return await asyncio.gather(
+            weather.get_alerts("ks"), weather.get_alerts(" KS "), weather.get_alerts("KS")
+        )
+
+    results = run(scenario)
+
+    assert len(set(results)) == 1
+    assert upstream.state.requests == 1
+
+
+def test_cancelled_waiter_does_not_cancel_shared_fetch(upstream):
+    url = f"{upstream.base_url}/alerts/active/area/KS"
+
+    async def scenario():
+        waiters = [asyncio.create_task(weather.make_nws_request(url)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        waiters[0].cancel()
+        return await asyncio.gather(*waiters, return_exceptions=True)
+
+    cancelled, *results = run(scenario)
+
+    assert isinstance(cancelled, asyncio.CancelledError)
+    assert all(isinstance(result, dict) for result in results)
+    assert upstream.state.requests == 1
+    assert weather.circuit_breaker.stats()["consecutive_failures"] == 0